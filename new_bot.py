@@ -156,6 +156,11 @@ from pipeline import (
     Step_5_generate_audio,
     Step_6_video_generation
 )
+from pipeline.fingerprint_index import FingerprintIndex, compute_video_fingerprint
+from pipeline.frame_store import FrameStore
+from pipeline.shot_index import shot_index_path
+from pipeline.vision_cache import VisionCache
+from pipeline.video_probe import forget_probe, probe_video
 
 # Constants
 MAX_VIDEO_SIZE = 50 * 1024 * 1024  # 50MB
@@ -235,9 +240,17 @@ class VideoBot:
         # Add performance settings
         self.max_memory_percent = 75
         self.max_concurrent_processes = 2
+        self.frame_memory_budget_mb = 256  # Per job, so concurrent jobs stay under the memory gate
+        self.frame_audio_weight = 0.3  # Favour key frames at loud moments and sound onsets
         self.active_processes = 0
         self.process_lock = asyncio.Lock()
         self.thread_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="video_worker")
+        
+        # Frame analysis of processed videos, reused when the same clip is uploaded again
+        self.fingerprint_index = FingerprintIndex(os.getenv("FINGERPRINT_DB", "video_fingerprints.sqlite"))
+        
+        # Vision API results by frame content, reused when a user retries or switches style
+        self.vision_cache = VisionCache(os.getenv("VISION_CACHE_DB", "vision_cache.sqlite"))
 
     def get_user_settings(self, user_id: int) -> dict:
         """Get settings for a user, with defaults if not set."""
@@ -356,6 +369,49 @@ class VideoBot:
                 parse_mode='Markdown'
             )
 
+    def find_cached_analysis(self, video_path: str, probe, metadata: dict, language: str):
+        """
+        Look up the frame analysis of an earlier copy of a video.
+        
+        Returns:
+            Tuple of the video fingerprint (None if it could not be computed) and
+            the cached analysis with metadata for this upload, or None on a miss
+        """
+        try:
+            fingerprint = compute_video_fingerprint(video_path, probe)
+            cached = self.fingerprint_index.lookup(fingerprint) if fingerprint is not None else None
+        except Exception as e:
+            logger.warning(f"Fingerprint lookup failed: {str(e)}")
+            return None, None
+        
+        if cached is None:
+            return fingerprint, None
+        
+        # Frame findings carry over; title, description and language belong to this upload
+        cached_metadata = cached.get('metadata', {})
+        cached['metadata'] = {
+            **{key: cached_metadata[key] for key in ('scene_changes', 'motion_scores', 'shots') if key in cached_metadata},
+            **(metadata or {}),
+            'duration': float(probe.duration),
+            'language': language
+        }
+        logger.info("Reusing frame analysis of a previously processed copy of this video")
+        return fingerprint, cached
+    
+    def index_analysis(self, fingerprint, frames_info: dict):
+        """
+        Index a frame analysis for re-uploads of the same video.
+        
+        Analyses with frames that Google Vision or OpenAI failed on are not indexed,
+        so a transient API error is not served to every later copy of the video.
+        """
+        if fingerprint is None:
+            return
+        if not frames_info.get('complete') or not frames_info.get('frames'):
+            logger.info("Frame analysis is incomplete, not indexing it for re-uploads")
+            return
+        self.fingerprint_index.add(fingerprint, frames_info)
+    
     def validate_language_settings(self, user_id: int) -> bool:
         """Validate language settings compatibility."""
         settings = self.get_user_settings(user_id)
@@ -581,45 +637,64 @@ class VideoBot:
                     "30% ▰▰▰▱▱▱▱▱▱▱"
                 )
                 
-                key_frames, scene_changes, motion_scores, duration, file_metadata = Step_2_extract_frames.execute_step(
-                    video_file=video_path,
-                    output_dir=output_dir
-                )
-                
-                # Convert any numpy floats to Python floats
-                duration = float(duration)
-                motion_scores = [(path, float(score)) for path, score in motion_scores]
-                
-                # Combine metadata from file and provided metadata
-                combined_metadata = {
-                    **(file_metadata or {}),  # Metadata from video file
-                    **(metadata or {}),       # Provided metadata
-                    'duration': duration,
-                    'scene_changes': [str(p) for p in scene_changes],
-                    'motion_scores': [(str(p), score) for p, score in motion_scores],
-                    'language': settings['language']  # Add language to metadata
-                }
+                # Probe the video once and share the metadata with every step
+                probe = probe_video(video_path)
                 
-                # Store frame info for later steps
-                frames_info = {
-                    'metadata': combined_metadata
-                }
-                
-                # Step 3: Analyze frames
-                logger.info("Analyzing frames...")
-                await status_message.edit_text(
-                    "🔍 Analyzing video content...\n\n"
-                    "50% ▰▰▰▰▰▱▱▱▱▱"
-                )
-                
-                frames_info = await Step_3_analyze_frames.execute_step(
-                    frames_dir=output_dir / "frames",
-                    output_dir=output_dir,
-                    metadata=frames_info['metadata'],
-                    scene_changes=scene_changes,
-                    motion_scores=motion_scores,
-                    video_duration=duration
-                )
+                # Reuse the frame analysis of an earlier copy of this video
+                fingerprint, frames_info = self.find_cached_analysis(video_path, probe, metadata, settings['language'])
+                if frames_info is None:
+                    # Hand the key frames to frame analysis in memory
+                    frame_store = FrameStore()
+                    key_frames, scene_changes, motion_scores, duration, file_metadata, shot_index = Step_2_extract_frames.execute_step(
+                        video_file=video_path,
+                        output_dir=output_dir,
+                        probe=probe,
+                        frame_store=frame_store,
+                        output_profile="vision",
+                        audio_weight=self.frame_audio_weight,
+                        memory_budget_mb=self.frame_memory_budget_mb
+                    )
+                    
+                    # Convert any numpy floats to Python floats
+                    duration = float(duration)
+                    motion_scores = [(path, float(score)) for path, score in motion_scores]
+                    
+                    # Combine metadata from file and provided metadata
+                    combined_metadata = {
+                        **(file_metadata or {}),  # Metadata from video file
+                        **(metadata or {}),       # Provided metadata
+                        'duration': duration,
+                        'scene_changes': [str(p) for p in scene_changes],
+                        'motion_scores': [(str(p), score) for p, score in motion_scores],
+                        'shots': shot_index.segments(),
+                        'language': settings['language']  # Add language to metadata
+                    }
+                    
+                    # Store frame info for later steps
+                    frames_info = {
+                        'metadata': combined_metadata
+                    }
+                    
+                    # Step 3: Analyze frames
+                    logger.info("Analyzing frames...")
+                    await status_message.edit_text(
+                        "🔍 Analyzing video content...\n\n"
+                        "50% ▰▰▰▰▰▱▱▱▱▱"
+                    )
+                    
+                    frames_info = await Step_3_analyze_frames.execute_step(
+                        frames_dir=output_dir / "frames",
+                        output_dir=output_dir,
+                        metadata=frames_info['metadata'],
+                        scene_changes=scene_changes,
+                        motion_scores=motion_scores,
+                        video_duration=duration,
+                        frame_store=frame_store,
+                        vision_cache=self.vision_cache,
+                        shot_index=shot_index
+                    )
+                    
+                    self.index_analysis(fingerprint, frames_info)
                 
                 # Step 4: Generate commentary
                 logger.info(f"Generating commentary in {settings['language']}...")
@@ -658,7 +733,8 @@ class VideoBot:
                     Path(video_path),
                     Path(str(audio_path)),
                     output_dir,
-                    settings['style']
+                    settings['style'],
+                    probe=probe
                 )
                 
                 if not final_video:
@@ -689,6 +765,7 @@ class VideoBot:
                 
             finally:
                 # Cleanup output directory
+                forget_probe(video_path)
                 if output_dir.exists():
                     shutil.rmtree(output_dir)
                 
@@ -1013,6 +1090,8 @@ class VideoBot:
                     # Cleanup
                     if os.path.exists(video_path):
                         os.remove(video_path)
+                    forget_probe(video_path)
+                    shot_index_path(video_path).unlink(missing_ok=True)
                     if output_dir.exists():
                         shutil.rmtree(output_dir)
                     
@@ -1034,14 +1113,14 @@ class VideoBot:
     def optimize_video_for_processing(self, video_path: str) -> str:
         """Optimize video before processing to reduce memory usage."""
         try:
+            # Get video properties
+            probe = probe_video(video_path)
+            width, height = probe.size
+            fps = int(probe.fps)
+            
             # Read video
             cap = cv2.VideoCapture(video_path)
             
-            # Get video properties
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            fps = int(cap.get(cv2.CAP_PROP_FPS))
-            
             # Calculate new dimensions (max 720p)
             if height > 720:
                 ratio = 720.0 / height
@@ -1088,46 +1167,65 @@ class VideoBot:
             
             # Extract frames
             logger.info("Extracting frames...")
-            key_frames, scene_changes, motion_scores, duration, file_metadata = Step_2_extract_frames.execute_step(
-                video_file=video_path,
-                output_dir=output_dir
-            )
-            
-            # Convert any numpy floats to Python floats
-            duration = float(duration)
-            motion_scores = [(path, float(score)) for path, score in motion_scores]
+            # Probe the video once and share the metadata with every step
+            probe = probe_video(video_path)
             
-            # Combine metadata from file and provided metadata
-            combined_metadata = {
-                **(file_metadata or {}),  # Metadata from video file
-                **(metadata or {}),       # Provided metadata
-                'duration': duration,
-                'scene_changes': [str(p) for p in scene_changes],
-                'motion_scores': [(str(p), score) for p, score in motion_scores],
-                'language': settings['language']  # Add language to metadata
-            }
-            
-            # Store frame info for later steps
-            frames_info = {
-                'metadata': combined_metadata
-            }
-            
-            # Update status
-            await status_message.edit_text(
-                "🔍 Analyzing video content...\n\n"
-                "50% ▰▰▰▰▰▱▱▱▱▱"
-            )
-            
-            # Analyze frames
-            logger.info("Analyzing frames...")
-            frames_info = await Step_3_analyze_frames.execute_step(
-                frames_dir=output_dir / "frames",
-                output_dir=output_dir,
-                metadata=frames_info['metadata'],
-                scene_changes=scene_changes,
-                motion_scores=motion_scores,
-                video_duration=duration
-            )
+            # Reuse the frame analysis of an earlier copy of this video
+            fingerprint, frames_info = self.find_cached_analysis(video_path, probe, metadata, settings['language'])
+            if frames_info is None:
+                # Hand the key frames to frame analysis in memory
+                frame_store = FrameStore()
+                key_frames, scene_changes, motion_scores, duration, file_metadata, shot_index = Step_2_extract_frames.execute_step(
+                    video_file=video_path,
+                    output_dir=output_dir,
+                    probe=probe,
+                    frame_store=frame_store,
+                    output_profile="vision",
+                    audio_weight=self.frame_audio_weight,
+                    memory_budget_mb=self.frame_memory_budget_mb
+                )
+                
+                # Convert any numpy floats to Python floats
+                duration = float(duration)
+                motion_scores = [(path, float(score)) for path, score in motion_scores]
+                
+                # Combine metadata from file and provided metadata
+                combined_metadata = {
+                    **(file_metadata or {}),  # Metadata from video file
+                    **(metadata or {}),       # Provided metadata
+                    'duration': duration,
+                    'scene_changes': [str(p) for p in scene_changes],
+                    'motion_scores': [(str(p), score) for p, score in motion_scores],
+                    'shots': shot_index.segments(),
+                    'language': settings['language']  # Add language to metadata
+                }
+                
+                # Store frame info for later steps
+                frames_info = {
+                    'metadata': combined_metadata
+                }
+                
+                # Update status
+                await status_message.edit_text(
+                    "🔍 Analyzing video content...\n\n"
+                    "50% ▰▰▰▰▰▱▱▱▱▱"
+                )
+                
+                # Analyze frames
+                logger.info("Analyzing frames...")
+                frames_info = await Step_3_analyze_frames.execute_step(
+                    frames_dir=output_dir / "frames",
+                    output_dir=output_dir,
+                    metadata=frames_info['metadata'],
+                    scene_changes=scene_changes,
+                    motion_scores=motion_scores,
+                    video_duration=duration,
+                    frame_store=frame_store,
+                    vision_cache=self.vision_cache,
+                    shot_index=shot_index
+                )
+                
+                self.index_analysis(fingerprint, frames_info)
             
             # Update status
             await status_message.edit_text(
@@ -1169,7 +1267,8 @@ class VideoBot:
                 Path(video_path),
                 Path(str(audio_path)),
                 output_dir,
-                settings['style']
+                settings['style'],
+                probe=probe
             )
             
             if final_video:
@@ -3,68 +3,505 @@ Step 2: Frame extraction module
 Extracts key frames from video using scene detection and motion analysis
 """
 
+import abc
+import heapq
 import logging
+import math
+import multiprocessing
+import subprocess
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Tuple
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
 import cv2
 import numpy as np
 
+from .audio_energy import AudioEnvelope, compute_audio_envelope
+from .frame_encoding import (
+    DEDUP_BRIGHTNESS_TOLERANCE,
+    DEFAULT_PROXY_WIDTH,
+    OUTPUT_PROFILES,
+    dhash_batch,
+    get_output_profile,
+    hamming_distances,
+    make_proxy
+)
+from .frame_store import FrameStore
+from .memory_monitor import MemoryMonitor
+from .shot_index import ShotIndex, build_shot_index, load_shot_index, params_signature, shot_index_path
+from .video_probe import VideoProbe, list_keyframe_times, probe_video
+
 logger = logging.getLogger(__name__)
 
+# Minimum time in seconds between two saved key frames
+MIN_FRAME_SPACING = 2.0
+
+# Motion estimators selectable on FrameExtractor
+MOTION_ENGINES = ("farneback", "lk", "phase")
+
+# Object presence signal: worker threads for cascade detection and detections counted at most
+DETECTION_THREADS = 4
+MAX_OBJECT_COUNT = 3
+
+# Auto-calibration: samples scored per video, sampling rate cap and threshold percentile
+DEFAULT_SAMPLE_BUDGET = 360
+MAX_SAMPLE_RATE = 10.0
+ADAPTIVE_PERCENTILE = 90.0
+
+# Smallest divisor when scores are compared with their thresholds as ratios
+MIN_THRESHOLD = 1e-6
+
+# Near-duplicate removal: maximum Hamming distance between 64-bit dHashes of duplicate frames
+DEFAULT_DEDUP_DISTANCE = 6
+
+# Worker threads encoding saved frames (cv2.imencode releases the GIL)
+ENCODE_THREADS = 4
+
+# Bounded-memory mode: share of the memory budget that full-resolution frames queued for encoding may use
+RESIDENT_FRAME_SHARE = 0.25
+
+def iter_sample_positions(cap: cv2.VideoCapture, frame_count: int, frame_interval: int, decode_mode: str,
+                          start_frame: int = 0):
+    """
+    Yield the frame numbers to sample, with the capture positioned on each one.
+
+    The caller decodes the current frame with cap.retrieve(). In "sequential" mode
+    the video is read forward once and non-sampled frames are only grabbed, which
+    avoids a keyframe seek and GOP re-decode per sample. "seek" mode keeps the old
+    behaviour of jumping straight to every sampled frame. Sampling starts at
+    start_frame, which should be a multiple of frame_interval, and stops before
+    frame_count.
+    """
+    if decode_mode == "seek":
+        for frame_number in range(start_frame, frame_count, frame_interval):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+            if not cap.grab():
+                break
+            yield frame_number
+    elif decode_mode == "sequential":
+        if start_frame > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        frame_number = start_frame
+        while frame_number < frame_count:
+            if not cap.grab():
+                break
+            if frame_number % frame_interval == 0:
+                yield frame_number
+            frame_number += 1
+    else:
+        raise ValueError(f"Unknown decode mode: {decode_mode}")
+
+_detection_models = threading.local()
+_detection_pool = None
+_detection_pool_lock = threading.Lock()
+
+def get_detection_models() -> Tuple["cv2.CascadeClassifier", "cv2.CascadeClassifier"]:
+    """
+    Return the (face, body) Haar cascades, loaded once per thread of this process.
+    
+    Cascade classifiers keep per-call scratch state, so threads do not share one
+    instance; the detection pool threads are long-lived, so each loads them once.
+    """
+    if getattr(_detection_models, "face", None) is None:
+        _detection_models.face = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        _detection_models.body = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_fullbody.xml')
+    return _detection_models.face, _detection_models.body
+
+def _get_detection_pool() -> ThreadPoolExecutor:
+    """Return the process-wide thread pool for cascade detection (OpenCV releases the GIL)."""
+    global _detection_pool
+    with _detection_pool_lock:
+        if _detection_pool is None:
+            _detection_pool = ThreadPoolExecutor(max_workers=DETECTION_THREADS, thread_name_prefix="object_detect")
+        return _detection_pool
+
+_encode_pool = None
+_encode_pool_lock = threading.Lock()
+
+def _get_encode_pool() -> ThreadPoolExecutor:
+    """Return the process-wide thread pool that encodes and writes saved frames."""
+    global _encode_pool
+    with _encode_pool_lock:
+        if _encode_pool is None:
+            _encode_pool = ThreadPoolExecutor(max_workers=ENCODE_THREADS, thread_name_prefix="frame_encode")
+        return _encode_pool
+
+def calibrate_frame_interval(fps: float, frame_count: int, sample_budget: int = DEFAULT_SAMPLE_BUDGET,
+                             max_sample_rate: float = MAX_SAMPLE_RATE) -> int:
+    """
+    Pick a sampling interval that keeps the number of scored frames within budget.
+    
+    The interval is the smallest one that both scores at most sample_budget frames
+    over the whole video and samples at most max_sample_rate frames per second.
+    """
+    by_budget = math.ceil(frame_count / sample_budget) if sample_budget > 0 else 1
+    by_rate = math.ceil(fps / max_sample_rate) if fps > 0 and max_sample_rate > 0 else 1
+    return max(1, by_budget, by_rate)
+
+class AdaptiveThreshold:
+    """
+    Selection threshold that follows a running percentile of the observed scores.
+    
+    The configured value acts as a floor, so the threshold only rises on videos
+    where most frames would pass it, such as shaky phone footage. With percentile
+    None the threshold stays fixed at the configured value.
+    """
+    
+    def __init__(self, floor: float, percentile: Optional[float] = None, warmup: int = 20, window: int = 512):
+        """
+        Initialize adaptive threshold.
+        
+        Args:
+            floor: Configured threshold, never undercut
+            percentile: Percentile of recent scores to follow, None for a fixed threshold
+            warmup: Number of scores observed before the percentile is applied
+            window: Number of most recent scores the percentile is computed over
+        """
+        self.floor = floor
+        self.percentile = percentile
+        self.warmup = warmup
+        self.value = floor
+        self.scores = deque(maxlen=window)
+    
+    def observe(self, score: float) -> float:
+        """Record a score and return the threshold to apply to it."""
+        if self.percentile is not None:
+            self.scores.append(score)
+            if len(self.scores) >= self.warmup:
+                self.value = max(self.floor, float(np.percentile(self.scores, self.percentile)))
+        return self.value
+
+def threshold_ratio(score: float, limit: float) -> float:
+    """
+    How far a score exceeds its threshold, as score / limit; above 1 means it passes.
+    
+    Thresholds are clamped to MIN_THRESHOLD, so a zero threshold passes any
+    score above it, as score > limit would.
+    """
+    return score / max(limit, MIN_THRESHOLD)
+
+@dataclass
+class SampledFrame:
+    """A sampled video frame and its cached low-resolution analysis proxy."""
+    frame_number: int
+    timestamp: float
+    frame: Optional[np.ndarray]  # Full-resolution BGR frame, None for analysis-only sources
+    proxy: Optional[np.ndarray] = None  # Downscaled grayscale frame shared by all scorers
+
+class FrameScorer(abc.ABC):
+    """
+    Scene-change scorer interface.
+    
+    Scorers compare grayscale proxies and return a difference on a 0-100 scale
+    (higher means more different). How far apart a cut and a still shot land on
+    that scale depends on the scorer, so each scorer carries the min_scene_change
+    that execute_step uses unless the caller passes one.
+    """
+    
+    # Number of proxies the extractor should hand to score_batch at once
+    batch_size = 1
+    
+    # Scene-change threshold calibrated for this scorer on the synthetic benchmark clips
+    default_scene_change = 30.0
+    
+    def score(self, proxy: np.ndarray, prev_proxy: np.ndarray) -> float:
+        """Score one proxy against the previous one."""
+        return float(self.score_batch([proxy], prev_proxy)[0])
+    
+    @abc.abstractmethod
+    def score_batch(self, proxies: List[np.ndarray], prev_proxy: Optional[np.ndarray]) -> np.ndarray:
+        """
+        Score each proxy against its predecessor.
+        
+        The first proxy is compared with prev_proxy and scores zero if there is none.
+        """
+
+class AbsDiffScorer(FrameScorer):
+    """Mean of the min-max normalized absolute difference between two frames."""
+    
+    def score_batch(self, proxies: List[np.ndarray], prev_proxy: Optional[np.ndarray]) -> np.ndarray:
+        scores = np.zeros(len(proxies), dtype=np.float64)
+        for i, proxy in enumerate(proxies):
+            previous = prev_proxy if i == 0 else proxies[i - 1]
+            if previous is None:
+                continue
+            diff = cv2.absdiff(make_proxy(previous, None), make_proxy(proxy, None))
+            norm_diff = cv2.normalize(diff, None, 0, 255, cv2.NORM_MINMAX)
+            scores[i] = np.mean(norm_diff)
+        return scores
+
+class HistogramScorer(FrameScorer):
+    """
+    Shot boundary scorer comparing gray-level histograms.
+    
+    Histograms for a whole batch of proxies are computed in one NumPy pass with
+    a single bincount over the stacked array, and consecutive histograms are
+    compared with the Bhattacharyya or chi-square distance. Unlike the min-max
+    normalized absolute difference, sensor noise on a static shot barely moves
+    the histogram, so it does not register as a scene change.
+    """
+    
+    batch_size = 16
+    
+    # Hard cuts and cross-fades score roughly 5-30, sensor noise and pans stay below 3
+    default_scene_change = 4.0
+    
+    def __init__(self, bins: int = 32, method: str = "bhattacharyya"):
+        """
+        Initialize histogram scorer.
+        
+        Args:
+            bins: Number of gray-level bins
+            method: "bhattacharyya" or "chisqr"
+        """
+        if method not in ("bhattacharyya", "chisqr"):
+            raise ValueError(f"Unknown histogram distance: {method}")
+        self.bins = bins
+        self.method = method
+    
+    def _histograms(self, proxies: List[np.ndarray]) -> np.ndarray:
+        """Return normalized histograms for all proxies as an (N, bins) array."""
+        stack = np.stack(proxies).reshape(len(proxies), -1)
+        index = (stack.astype(np.uint16) * self.bins) >> 8
+        index = index.astype(np.int64) + (np.arange(len(proxies), dtype=np.int64) * self.bins)[:, None]
+        hist = np.bincount(index.ravel(), minlength=len(proxies) * self.bins)
+        hist = hist.reshape(len(proxies), self.bins).astype(np.float64)
+        return hist / np.maximum(hist.sum(axis=1, keepdims=True), 1.0)
+    
+    def score_batch(self, proxies: List[np.ndarray], prev_proxy: Optional[np.ndarray]) -> np.ndarray:
+        if not proxies:
+            return np.zeros(0, dtype=np.float64)
+        has_prev = prev_proxy is not None
+        hist = self._histograms([prev_proxy] + list(proxies) if has_prev else list(proxies))
+        current, previous = hist[1:], hist[:-1]
+        
+        if self.method == "bhattacharyya":
+            distance = np.sqrt(np.clip(1.0 - np.sqrt(current * previous).sum(axis=1), 0.0, None))
+        else:
+            distance = 0.5 * ((current - previous) ** 2 / (current + previous + 1e-10)).sum(axis=1)
+        
+        scores = distance * 100.0
+        return scores if has_prev else np.concatenate(([0.0], scores))
+
+# Scene-change scorers selectable by name
+SCORERS = {
+    "absdiff": AbsDiffScorer,
+    "histogram": HistogramScorer
+}
+
+def get_scorer(name: str) -> FrameScorer:
+    """Create a scene-change scorer by name."""
+    if name not in SCORERS:
+        raise ValueError(f"Unknown frame scorer: {name}")
+    return SCORERS[name]()
+
+class FFmpegFrameSource:
+    """
+    Decodes small grayscale analysis frames through an ffmpeg raw-video pipe.
+    
+    Sampling, downscaling and grayscale conversion all happen inside ffmpeg, so
+    Python only ever sees width x height bytes per sampled frame. Frames are
+    wrapped with np.frombuffer and are therefore read-only views, not copies.
+    """
+    
+    def __init__(self, video_path: Path, sample_fps: float, source_size: Tuple[int, int],
+                 width: int = DEFAULT_PROXY_WIDTH):
+        """
+        Initialize ffmpeg frame source.
+        
+        Args:
+            video_path: Path to video file
+            sample_fps: Number of frames per second to sample
+            source_size: (width, height) of the decoded video
+            width: Width of the analysis frames
+        """
+        self.video_path = video_path
+        self.sample_fps = sample_fps
+        src_width, src_height = source_size
+        self.width = min(width, src_width) if src_width > 0 else width
+        # Keep the height even, as required by most scalers
+        self.height = max(2, int(round(src_height * self.width / src_width / 2.0)) * 2) if src_width > 0 else self.width
+        self.frame_bytes = self.width * self.height
+    
+    def _build_command(self) -> List[str]:
+        """Build the ffmpeg command line for the raw grayscale pipe."""
+        return [
+            "ffmpeg", "-v", "error", "-nostdin",
+            "-i", str(self.video_path),
+            "-an", "-sn",
+            "-vf", f"fps={self.sample_fps:.6f},scale={self.width}:{self.height},format=gray",
+            "-f", "rawvideo", "-pix_fmt", "gray",
+            "pipe:1"
+        ]
+    
+    def _timestamp(self, index: int) -> Optional[float]:
+        """Presentation time of the index-th frame read from the pipe."""
+        return index / self.sample_fps
+    
+    def __iter__(self) -> Iterator[Tuple[float, np.ndarray]]:
+        """Yield (timestamp, grayscale frame) pairs."""
+        process = subprocess.Popen(
+            self._build_command(),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=self.frame_bytes * 4
+        )
+        try:
+            index = 0
+            while True:
+                data = process.stdout.read(self.frame_bytes)
+                if len(data) < self.frame_bytes:
+                    break
+                frame = np.frombuffer(data, dtype=np.uint8).reshape(self.height, self.width)
+                timestamp = self._timestamp(index)
+                if timestamp is None:
+                    break
+                yield timestamp, frame
+                index += 1
+        finally:
+            process.stdout.close()
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+
+class KeyframeSource(FFmpegFrameSource):
+    """Decodes grayscale analysis frames for codec keyframes only."""
+    
+    def __init__(self, video_path: Path, keyframe_times: List[float], source_size: Tuple[int, int],
+                 width: int = DEFAULT_PROXY_WIDTH):
+        """
+        Initialize keyframe source.
+        
+        Args:
+            video_path: Path to video file
+            keyframe_times: Keyframe presentation times, as listed by list_keyframe_times
+            source_size: (width, height) of the decoded video
+            width: Width of the analysis frames
+        """
+        super().__init__(video_path, 0.0, source_size, width)
+        self.keyframe_times = keyframe_times
+    
+    def _build_command(self) -> List[str]:
+        """Build an ffmpeg command that skips decoding of all non-key frames."""
+        return [
+            "ffmpeg", "-v", "error", "-nostdin",
+            "-skip_frame", "nokey",
+            "-i", str(self.video_path),
+            "-an", "-sn", "-vsync", "0",
+            "-vf", f"scale={self.width}:{self.height},format=gray",
+            "-f", "rawvideo", "-pix_fmt", "gray",
+            "pipe:1"
+        ]
+    
+    def _timestamp(self, index: int) -> Optional[float]:
+        return self.keyframe_times[index] if index < len(self.keyframe_times) else None
+
 class FrameExtractor:
     """Handles video frame extraction with intelligent frame selection."""
     
-    def __init__(self, video_path: Path, output_dir: Path):
+    def __init__(self, video_path: Path, output_dir: Path, scorer: Optional[FrameScorer] = None,
+                 motion_engine: str = "farneback", probe: Optional[VideoProbe] = None):
         """
         Initialize frame extractor.
         
         Args:
             video_path: Path to video file
             output_dir: Directory to save extracted frames
+            scorer: Scene-change scorer, defaults to AbsDiffScorer
+            motion_engine: Motion estimator ("farneback", "lk" or "phase")
+            probe: Shared video metadata, probed on first use when not given
         """
+        if motion_engine not in MOTION_ENGINES:
+            raise ValueError(f"Unknown motion engine: {motion_engine}")
         self.video_path = video_path
+        self._probe = probe
+        self.scorer = scorer or AbsDiffScorer()
+        self.motion_engine = motion_engine
         self.frames_dir = output_dir / "frames"
         self.frames_dir.mkdir(parents=True, exist_ok=True)
         self.scene_changes = []
         self.motion_scores = []
         
-        # Load object detection models only if needed
-        self.face_cascade = None
-        self.body_cascade = None
+        # Frames scored on low-resolution analysis frames, written at full resolution later
+        self.pending_full_frames = []
+        
+        # Ratio of full-resolution width to proxy width, used to report motion in source pixels
+        self.proxy_scale = 1.0
+        
+        # Percentile followed by the selection thresholds, None keeps them fixed
+        self.threshold_percentile = None
+        
+        # Weight of the face/body presence signal in selection, 0 disables it
+        self.object_weight = 0.0
+        
+        # Audio energy envelope and its weight in selection, 0 disables it
+        self.audio_envelope: Optional[AudioEnvelope] = None
+        self.audio_weight = 0.0
+        
+        # In-memory handoff of saved frames to frame analysis, None writes them to frames_dir
+        self.frame_store = None
+        
+        # Size and encoding of saved frames, and encodes still running on the encode pool
+        self.output_profile = OUTPUT_PROFILES["full"]
+        self.pending_writes = []
+        
+        # Bounded-memory mode: budget in megabytes (None disables it), full-resolution frames
+        # allowed in the encode queue, and the monitor sampling resident memory
+        self.memory_budget_mb = None
+        self.max_resident_frames = None
+        self.memory_monitor = None
+        self._gray_buffer = None
+        
+        # Every scored sample and the scores of every saved frame, for the shot index
+        self.sample_records = []
+        self.saved_frame_scores = {}
+        
+        # (dHash, mean brightness) of every saved frame, used to drop near-duplicates before frame analysis
+        self.frame_hashes = {}
+    
+    @property
+    def probe(self) -> VideoProbe:
+        """Video metadata, shared with the other pipeline steps."""
+        if self._probe is None:
+            self._probe = probe_video(self.video_path)
+        return self._probe
     
-    def _load_detection_models(self):
-        """Lazy load detection models only when needed."""
-        if self.face_cascade is None:
-            self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-            self.body_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_fullbody.xml')
+    @staticmethod
+    def _to_gray(frame: np.ndarray) -> np.ndarray:
+        """Return a grayscale view of a frame, converting only BGR input."""
+        if frame.ndim == 2:
+            return frame
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
     
     def _compute_frame_difference(self, frame1: np.ndarray, frame2: np.ndarray) -> float:
         """
-        Compute the difference between two frames.
-        Uses grayscale conversion and absolute difference.
+        Compute the difference between two frames with the configured scorer.
         """
-        gray1 = cv2.cvtColor(frame1, cv2.COLOR_BGR2GRAY)
-        gray2 = cv2.cvtColor(frame2, cv2.COLOR_BGR2GRAY)
-        
-        # Calculate absolute difference and normalize
-        diff = cv2.absdiff(gray1, gray2)
-        norm_diff = cv2.normalize(diff, None, 0, 255, cv2.NORM_MINMAX)
-        
-        return np.mean(norm_diff)
+        return self.scorer.score(frame1, frame2)
     
-    def _detect_motion(self, frame: np.ndarray, prev_frame: np.ndarray) -> float:
+    def _detect_motion(self, frame: np.ndarray, prev_frame: np.ndarray, scale: float = 1.0) -> float:
         """
-        Detect motion between frames using optical flow.
-        Returns average magnitude of motion vectors.
+        Detect motion between frames with the configured motion engine.
+        Returns average magnitude of motion in pixels, multiplied by scale so that
+        motion measured on a downscaled proxy is reported in source pixels.
         """
         if prev_frame is None:
             return 0.0
             
         # Convert to grayscale
-        gray1 = cv2.cvtColor(prev_frame, cv2.COLOR_BGR2GRAY)
-        gray2 = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray1 = self._to_gray(prev_frame)
+        gray2 = self._to_gray(frame)
         
-        # Calculate optical flow using Farneback method
+        if self.motion_engine == "lk":
+            return self._motion_lucas_kanade(gray1, gray2) * scale
+        if self.motion_engine == "phase":
+            return self._motion_phase_correlation(gray1, gray2) * scale
+        return self._motion_farneback(gray1, gray2) * scale
+    
+    def _motion_farneback(self, gray1: np.ndarray, gray2: np.ndarray) -> float:
+        """Mean magnitude of dense Farneback optical flow."""
         flow = cv2.calcOpticalFlowFarneback(
             gray1, gray2, None,
             pyr_scale=0.5,  # Pyramid scale
@@ -78,23 +515,99 @@ class FrameExtractor:
         
         # Calculate magnitude of flow vectors
         magnitude = np.sqrt(flow[..., 0]**2 + flow[..., 1]**2)
-        return np.mean(magnitude)
+        return float(np.mean(magnitude))
+    
+    def _motion_lucas_kanade(self, gray1: np.ndarray, gray2: np.ndarray) -> float:
+        """
+        Median displacement of corners tracked with pyramidal Lucas-Kanade.
+        
+        Corners are spread over the frame and the median is used because, like the
+        frame-wide mean of dense flow, it follows camera motion and is not dominated
+        by a few fast-moving small objects.
+        """
+        min_distance = max(3, gray1.shape[1] // 40)
+        corners = cv2.goodFeaturesToTrack(gray1, maxCorners=200, qualityLevel=0.01,
+                                          minDistance=min_distance, blockSize=7)
+        if corners is None:
+            return 0.0
+        
+        tracked, status, _ = cv2.calcOpticalFlowPyrLK(gray1, gray2, corners, None, winSize=(15, 15), maxLevel=2)
+        valid = status.ravel() == 1
+        if not np.any(valid):
+            return 0.0
+        
+        displacement = (tracked - corners).reshape(-1, 2)[valid]
+        return float(np.median(np.sqrt((displacement ** 2).sum(axis=1))))
+    
+    def _motion_phase_correlation(self, gray1: np.ndarray, gray2: np.ndarray) -> float:
+        """
+        Global shift from phase correlation plus an estimate of residual local motion.
+        
+        After aligning the frames on the global shift, the remaining intensity change
+        at each well-textured pixel divided by its gradient magnitude gives the normal
+        flow (from the brightness constancy equation I_t = -grad(I) . v). Averaged over
+        the whole frame, with flat pixels counting as still, this tracks the mean
+        magnitude of dense flow.
+        """
+        prev = gray1.astype(np.float32)
+        curr = gray2.astype(np.float32)
+        (dx, dy), _ = cv2.phaseCorrelate(prev, curr)
+        
+        # Undo the global shift and measure what is left
+        shift = np.float32([[1, 0, -dx], [0, 1, -dy]])
+        aligned = cv2.warpAffine(curr, shift, (curr.shape[1], curr.shape[0]), borderMode=cv2.BORDER_REPLICATE)
+        residual = np.abs(aligned - prev)
+        
+        # Sobel with ksize=3 has a gain of 8 per intensity level per pixel
+        grad_x = cv2.Sobel(prev, cv2.CV_32F, 1, 0, ksize=3)
+        grad_y = cv2.Sobel(prev, cv2.CV_32F, 0, 1, ksize=3)
+        gradient = np.sqrt(grad_x ** 2 + grad_y ** 2) / 8.0
+        
+        textured = gradient > 8.0
+        normal_flow = np.zeros_like(residual)
+        normal_flow[textured] = np.minimum(residual[textured] / gradient[textured], 8.0)
+        return float(np.hypot(dx, dy)) + float(np.mean(normal_flow))
     
     def _detect_objects(self, frame: np.ndarray) -> int:
         """
         Detect objects in frame using pre-trained models.
         Currently detects faces and bodies.
         """
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = self._to_gray(frame)
+        face_cascade, body_cascade = get_detection_models()
         
         # Detect faces
-        faces = self.face_cascade.detectMultiScale(gray, 1.3, 5)
+        faces = face_cascade.detectMultiScale(gray, 1.3, 5)
         
         # Detect bodies
-        bodies = self.body_cascade.detectMultiScale(gray, 1.1, 3)
+        bodies = body_cascade.detectMultiScale(gray, 1.1, 3)
         
         return len(faces) + len(bodies)
     
+    def _detect_objects_batch(self, proxies: List[np.ndarray]) -> List[int]:
+        """Count faces and bodies on several proxies concurrently in the detection thread pool."""
+        return list(_get_detection_pool().map(self._detect_objects, proxies))
+    
+    def _detect_objects_async(self, proxy: np.ndarray) -> Future:
+        """Start counting faces and bodies on a proxy in the detection thread pool."""
+        return _get_detection_pool().submit(self._detect_objects, proxy)
+    
+    def _object_boost(self, object_count: int) -> float:
+        """Score multiplier for a frame showing object_count faces or bodies."""
+        return 1.0 + self.object_weight * min(object_count, MAX_OBJECT_COUNT)
+    
+    def _audio_boost(self, timestamp: float) -> float:
+        """
+        Score multiplier from the audio energy around a timestamp.
+        
+        Ranges from 1 - audio_weight for silence to 1 + audio_weight for the
+        loudest moments and sharpest onsets of the clip, so quiet frames need
+        a stronger visual signal to be selected.
+        """
+        if self.audio_envelope is None or self.audio_weight <= 0:
+            return 1.0
+        return 1.0 + self.audio_weight * (2.0 * self.audio_envelope.energy_at(timestamp) - 1.0)
+    
     def _is_frame_interesting(self, 
                             frame: np.ndarray, 
                             prev_frame: np.ndarray,
@@ -117,84 +630,665 @@ class FrameExtractor:
         
         return is_scene_change or has_motion or has_objects
     
+    def _decode_samples(self, cap: cv2.VideoCapture, fps: float, frame_count: int, frame_interval: int,
+                        decode_mode: str, backend: str, proxy_width: Optional[int],
+                        start_frame: int = 0) -> Iterator[SampledFrame]:
+        """Decode stage: yield a SampledFrame for every sampled frame of the selected backend."""
+        if backend == "opencv":
+            # In bounded-memory mode every frame is decoded into the previous frame's array
+            buffer = None
+            for frame_number in iter_sample_positions(cap, frame_count, frame_interval, decode_mode, start_frame):
+                ret, frame = cap.retrieve(buffer) if buffer is not None else cap.retrieve()
+                if not ret:
+                    break
+                if self.memory_budget_mb is not None:
+                    buffer = frame
+                yield SampledFrame(frame_number, frame_number / fps, frame)
+        elif backend == "ffmpeg":
+            source_width = self.probe.width
+            source = FFmpegFrameSource(self.video_path, fps / frame_interval, self.probe.size,
+                                       proxy_width or source_width)
+            self.proxy_scale = source_width / source.width if source.width else 1.0
+            for timestamp, frame in source:
+                frame_number = int(round(timestamp * fps))
+                if frame_number >= frame_count:
+                    break
+                # ffmpeg already delivers grayscale frames at proxy size
+                yield SampledFrame(frame_number, timestamp, None, frame)
+        else:
+            raise ValueError(f"Unknown frame backend: {backend}")
+    
+    def _attach_proxies(self, samples: Iterator[SampledFrame], proxy_width: Optional[int],
+                        keep_frames: bool = True) -> Iterator[SampledFrame]:
+        """
+        Proxy stage: compute the grayscale proxy once per sample.
+        
+        With keep_frames False the full-resolution frame is released as soon as its
+        proxy exists, for selection modes that decode selected frames again later.
+        In bounded-memory mode the grayscale conversion reuses one scratch array.
+        """
+        for sample in samples:
+            if sample.proxy is None:
+                if self.memory_budget_mb is not None and self._gray_buffer is None:
+                    self._gray_buffer = np.empty(sample.frame.shape[:2], dtype=np.uint8)
+                sample.proxy = make_proxy(sample.frame, proxy_width, self._gray_buffer)
+                self.proxy_scale = sample.frame.shape[1] / sample.proxy.shape[1]
+            if not keep_frames:
+                sample.frame = None
+            yield sample
+    
+    def _score_samples(self, samples: Iterator[SampledFrame], batch_size: int = 1,
+                       with_motion: bool = True) -> Iterator[Tuple[SampledFrame, float, float]]:
+        """
+        Score stage: compare every sample with the previous one.
+        
+        Samples are scored in micro-batches of batch_size so vectorized scorers can
+        process several proxies in one pass. Apart from the batch, only the previous
+        proxy is kept alive, so memory stays flat regardless of video length. The
+        first sample has nothing to compare with and scores zero. With with_motion
+        False only the scene-change score is computed and motion scores zero.
+        """
+        prev_proxy = None
+        batch = []
+        for sample in samples:
+            batch.append(sample)
+            if len(batch) < batch_size:
+                continue
+            yield from self._score_batch(batch, prev_proxy, with_motion)
+            prev_proxy = batch[-1].proxy
+            batch = []
+        if batch:
+            yield from self._score_batch(batch, prev_proxy, with_motion)
+    
+    def _score_batch(self, batch: List[SampledFrame], prev_proxy: Optional[np.ndarray],
+                     with_motion: bool = True) -> Iterator[Tuple[SampledFrame, float, float]]:
+        """Score a batch of consecutive samples, the first one against prev_proxy."""
+        frame_diffs = self.scorer.score_batch([sample.proxy for sample in batch], prev_proxy)
+        for sample, frame_diff in zip(batch, frame_diffs):
+            motion_score = self._detect_motion(sample.proxy, prev_proxy, self.proxy_scale) if with_motion else 0.0
+            prev_proxy = sample.proxy
+            yield sample, float(frame_diff), float(motion_score)
+    
     def extract_frames(
         self,
         min_scene_change: float = 30.0,
         min_motion_threshold: float = 2.0,
         max_frames: int = 4,
-        frame_interval: int = 5
+        frame_interval: int = 5,
+        decode_mode: str = "sequential",
+        backend: str = "opencv",
+        proxy_width: Optional[int] = DEFAULT_PROXY_WIDTH,
+        selection: str = "greedy"
     ) -> List[Path]:
-        """Extract key frames with optimized processing."""
+        """
+        Extract key frames with a streaming decode -> proxy -> score -> select pipeline.
+        
+        Args:
+            min_scene_change: Minimum difference for scene change detection
+            min_motion_threshold: Minimum score for motion detection
+            max_frames: Maximum number of frames to extract
+            frame_interval: Sample every Nth frame
+            decode_mode: "sequential" (forward grab/retrieve) or "seek" (set position per sample)
+            backend: "opencv" scores full-resolution BGR frames, "ffmpeg" scores small
+                grayscale frames piped from ffmpeg and decodes full resolution only for saved frames
+            proxy_width: Width of the grayscale proxy frames used for scoring (None keeps full resolution)
+            selection: "greedy" saves the first max_frames frames that pass a threshold,
+                "topk" scores the whole video and keeps the best max_frames frames
+        """
         cap = cv2.VideoCapture(str(self.video_path))
         if not cap.isOpened():
             raise ValueError(f"Could not open video: {self.video_path}")
         
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        saved_frames = []
-        prev_frame = None
-        last_saved_time = -2
-        frame_buffer = []
+        fps = self.probe.fps
+        frame_count = self.probe.frame_count
         
-        logger.info("Analyzing video for key frames...")
+        logger.info(f"Analyzing video for key frames ({backend} backend, {decode_mode} decode)...")
         
-        for frame_number in range(0, frame_count, frame_interval):
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-            ret, frame = cap.read()
-            if not ret:
-                break
+        # Greedy selection writes frames as it goes; top-K decodes its picks again at the end.
+        # In bounded-memory mode the decode buffer is reused, so greedy decodes its picks again too.
+        keep_frames = selection == "greedy" and self.memory_budget_mb is None
+        batch_size = 1 if keep_frames and backend == "opencv" else self.scorer.batch_size
+        
+        samples = self._decode_samples(cap, fps, frame_count, frame_interval, decode_mode, backend, proxy_width)
+        samples = self._attach_proxies(samples, proxy_width, keep_frames)
+        saved_frames = self._select(
+            selection, self._score_samples(samples, batch_size), frame_count,
+            min_scene_change, min_motion_threshold, max_frames
+        )
+        
+        samples.close()
+        self._write_pending_full_frames(cap, fps)
+        cap.release()
+        logger.info(f"Extracted {len(saved_frames)} key frames")
+        return saved_frames
+    
+    def _select(self, selection: str, scored: Iterator[Tuple[SampledFrame, float, float]], frame_count: int,
+                min_scene_change: float, min_motion_threshold: float, max_frames: int) -> List[Path]:
+        """Run the select stage for the requested selection mode."""
+        scored = self._record_samples(scored)
+        scene_threshold = AdaptiveThreshold(min_scene_change, self.threshold_percentile)
+        motion_threshold = AdaptiveThreshold(min_motion_threshold, self.threshold_percentile)
+        if selection == "greedy":
+            return self._select_frames(scored, frame_count, scene_threshold, motion_threshold, max_frames)
+        if selection == "topk":
+            return self._select_top_frames(scored, frame_count, scene_threshold, motion_threshold, max_frames)
+        raise ValueError(f"Unknown selection mode: {selection}")
+    
+    def _record_samples(self, scored: Iterator[Tuple[SampledFrame, float, float]]
+                        ) -> Iterator[Tuple[SampledFrame, float, float]]:
+        """Keep the scores of every sample passed to selection, for the shot index."""
+        for sample, frame_diff, motion_score in scored:
+            self.sample_records.append((sample.frame_number, sample.timestamp, float(frame_diff), float(motion_score)))
+            yield sample, frame_diff, motion_score
+    
+    def _select_top_frames(
+        self,
+        scored: Iterator[Tuple[SampledFrame, float, float]],
+        frame_count: int,
+        scene_threshold: AdaptiveThreshold,
+        motion_threshold: AdaptiveThreshold,
+        max_frames: int
+    ) -> List[Path]:
+        """
+        Select stage: keep the best max_frames frames of the whole video.
+        
+        A frame's score is how far it exceeds the stronger of its two thresholds.
+        Candidates are kept in a bounded min-heap with temporal non-maximum
+        suppression: a candidate within MIN_FRAME_SPACING of a better one is
+        dropped, and weaker pooled candidates near a new one are evicted. Only
+        the final frames are decoded and encoded, after the whole video is scored.
+        
+        With the object signal enabled, the pool holds twice as many candidates and
+        their proxies. Faces and bodies are then counted on those proxies in the
+        detection thread pool, and the boosted scores pick the final frames.
+        """
+        pool = []  # Min-heap of (score, frame_number, timestamp, frame_diff, motion_score)
+        use_objects = self.object_weight > 0
+        pool_size = max_frames * 2 if use_objects else max_frames
+        proxies = {}  # Candidate proxies by frame number, kept only for the object signal
+        
+        for sample, frame_diff, motion_score in scored:
+            if sample.frame_number % 100 == 0:
+                logger.info(f"Progress: {(sample.frame_number / frame_count) * 100:.1f}%")
             
-            timestamp = frame_number / fps
+            scene_limit = scene_threshold.observe(frame_diff)
+            motion_limit = motion_threshold.observe(motion_score)
+            score = max(threshold_ratio(frame_diff, scene_limit), threshold_ratio(motion_score, motion_limit))
+            score *= self._audio_boost(sample.timestamp)
+            if score <= 1.0:
+                continue
             
-            # Skip if too close to last saved frame
-            if timestamp - last_saved_time < 2:
+            # Temporal NMS against the candidates already pooled
+            neighbours = {entry[1] for entry in pool if abs(entry[2] - sample.timestamp) < MIN_FRAME_SPACING}
+            if any(entry[0] >= score for entry in pool if entry[1] in neighbours):
                 continue
+            if neighbours:
+                pool = [entry for entry in pool if entry[1] not in neighbours]
+                heapq.heapify(pool)
             
-            # Buffer frames for batch processing
-            frame_buffer.append((frame, timestamp))
-            if len(frame_buffer) >= 10:  # Process in batches of 10
-                self._process_frame_batch(frame_buffer, saved_frames, min_scene_change, min_motion_threshold)
-                frame_buffer = []
+            candidate = (score, sample.frame_number, sample.timestamp, float(frame_diff), float(motion_score))
+            if len(pool) < pool_size:
+                heapq.heappush(pool, candidate)
+            elif score > pool[0][0]:
+                heapq.heapreplace(pool, candidate)
+            else:
+                continue
+            if use_objects and sample.proxy is not None:
+                proxies[sample.frame_number] = sample.proxy
+                # Drop proxies of evicted candidates
+                if len(proxies) > len(pool):
+                    pooled = {entry[1] for entry in pool}
+                    proxies = {number: proxy for number, proxy in proxies.items() if number in pooled}
+        
+        if use_objects and pool:
+            candidates = [entry for entry in pool if entry[1] in proxies]
+            counts = self._detect_objects_batch([proxies[entry[1]] for entry in candidates])
+            boosted = {entry[1]: entry[0] * self._object_boost(count) for entry, count in zip(candidates, counts)}
+            pool = [(boosted.get(entry[1], entry[0]),) + entry[1:] for entry in pool]
+            pool = sorted(pool, reverse=True)[:max_frames]
+        
+        saved_frames = []
+        for score, frame_number, timestamp, frame_diff, motion_score in sorted(pool, key=lambda entry: entry[2]):
+            frame_path = self._frame_path(timestamp)
+            self._save_frame(frame_path, SampledFrame(frame_number, timestamp, None), frame_diff, motion_score)
+            saved_frames.append(frame_path)
             
-            if len(saved_frames) >= max_frames:
-                break
+            is_scene_change = frame_diff > scene_threshold.value
+            if is_scene_change:
+                self.scene_changes.append(frame_path)
+            self.motion_scores.append((frame_path, motion_score))
             
-            if frame_number % 100 == 0:
-                logger.info(f"Progress: {(frame_number / frame_count) * 100:.1f}%")
+            logger.info(f"Selected frame at {timestamp:.2f}s (score={score:.2f}, scene_change={is_scene_change}, "
+                      f"motion={motion_score:.2f})")
+        
+        return saved_frames
+    
+    def _select_frames(
+        self,
+        scored: Iterator[Tuple[SampledFrame, float, float]],
+        frame_count: int,
+        scene_threshold: AdaptiveThreshold,
+        motion_threshold: AdaptiveThreshold,
+        max_frames: int
+    ) -> List[Path]:
+        """
+        Select stage: save scored samples that pass a threshold, in time order.
         
-        # Process remaining frames
-        if frame_buffer:
-            self._process_frame_batch(frame_buffer, saved_frames, min_scene_change, min_motion_threshold)
+        Near misses are checked for faces and bodies on the detection thread pool
+        while the following samples are scored. Up to DETECTION_THREADS samples
+        wait behind a pending detection, so selection stays in time order.
+        """
+        saved_frames = []
+        last_saved_time = -MIN_FRAME_SPACING
+        
+        max_boost = self._object_boost(MAX_OBJECT_COUNT)
+        lookahead = DETECTION_THREADS
+        if self.max_resident_frames is not None:
+            lookahead = min(lookahead, self.max_resident_frames)
+        pending = deque()
+        
+        def select(sample: SampledFrame, frame_diff: float, motion_score: float, is_scene_change: bool,
+                   score: float, detection: Optional[Future]) -> bool:
+            """Save a sample if it is interesting; returns True once max_frames are saved."""
+            nonlocal last_saved_time
+            is_interesting = score > 1.0
+            if detection is not None:
+                is_interesting = score * self._object_boost(detection.result()) > 1.0
+            
+            # Select interesting frames that are not too close to the last saved frame
+            if is_interesting and sample.timestamp - last_saved_time >= MIN_FRAME_SPACING:
+                frame_path = self._frame_path(sample.timestamp)
+                self._save_frame(frame_path, sample, frame_diff, motion_score)
+                saved_frames.append(frame_path)
+                last_saved_time = sample.timestamp
+                
+                if is_scene_change:
+                    self.scene_changes.append(frame_path)
+                self.motion_scores.append((frame_path, motion_score))
+                
+                logger.info(f"Saved frame at {sample.timestamp:.2f}s (scene_change={is_scene_change}, "
+                          f"motion={motion_score:.2f})")
+            
+            if sample.frame_number % 100 == 0:
+                logger.info(f"Progress: {(sample.frame_number / frame_count) * 100:.1f}%")
+            return len(saved_frames) >= max_frames
+        
+        for sample, frame_diff, motion_score in scored:
+            scene_limit = scene_threshold.observe(frame_diff)
+            motion_limit = motion_threshold.observe(motion_score)
+            is_scene_change = frame_diff > scene_limit
+            score = max(threshold_ratio(frame_diff, scene_limit), threshold_ratio(motion_score, motion_limit))
+            score *= self._audio_boost(sample.timestamp)
+            
+            # Near misses are candidates for the object signal: check them for people
+            detection = None
+            if (score <= 1.0 and score * max_boost > 1.0 and self.object_weight > 0 and sample.proxy is not None
+                    and sample.timestamp - last_saved_time >= MIN_FRAME_SPACING):
+                detection = self._detect_objects_async(sample.proxy)
+            pending.append((sample, frame_diff, motion_score, is_scene_change, score, detection))
+            
+            # Decide in time order, as soon as the oldest sample's detection is done
+            while pending and (pending[0][5] is None or pending[0][5].done() or len(pending) > lookahead):
+                if select(*pending.popleft()):
+                    return saved_frames
         
+        while pending:
+            if select(*pending.popleft()):
+                break
+        
+        return saved_frames
+    
+    def score_segment(
+        self,
+        start_frame: int,
+        end_frame: int,
+        frame_interval: int,
+        decode_mode: str = "sequential",
+        proxy_width: Optional[int] = DEFAULT_PROXY_WIDTH
+    ) -> List[Tuple[int, float, float, float]]:
+        """
+        Score the sampled frames in [start_frame, end_frame) with a dedicated capture.
+        
+        Decoding starts one sample before start_frame so the first sample of the
+        segment is compared with the last sample of the previous segment; that
+        overlap sample itself belongs to the previous segment and is not returned.
+        
+        Returns:
+            List of (frame number, timestamp, frame difference, motion score)
+        """
+        cap = cv2.VideoCapture(str(self.video_path))
+        if not cap.isOpened():
+            raise ValueError(f"Could not open video: {self.video_path}")
+        
+        fps = self.probe.fps
+        decode_start = max(0, start_frame - frame_interval)
+        samples = self._decode_samples(cap, fps, end_frame, frame_interval, decode_mode, "opencv",
+                                       proxy_width, decode_start)
+        candidates = [
+            (sample.frame_number, sample.timestamp, float(frame_diff), float(motion_score))
+            for sample, frame_diff, motion_score in self._score_samples(
+                self._attach_proxies(samples, proxy_width, keep_frames=False), self.scorer.batch_size
+            )
+            if sample.frame_number >= start_frame
+        ]
+        cap.release()
+        return candidates
+    
+    def extract_frames_parallel(
+        self,
+        workers: int,
+        min_scene_change: float = 30.0,
+        min_motion_threshold: float = 2.0,
+        max_frames: int = 4,
+        frame_interval: int = 5,
+        decode_mode: str = "sequential",
+        proxy_width: Optional[int] = DEFAULT_PROXY_WIDTH,
+        selection: str = "greedy"
+    ) -> List[Path]:
+        """
+        Extract key frames by scoring time segments of the video in parallel processes.
+        
+        Each worker opens its own capture and scores one segment. The per-segment
+        scores are merged in time order and passed through the same selection as
+        extract_frames, then only the selected frames are decoded and written.
+        
+        Args:
+            workers: Number of worker processes / time segments
+            (other arguments as in extract_frames)
+        """
+        cap = cv2.VideoCapture(str(self.video_path))
+        if not cap.isOpened():
+            raise ValueError(f"Could not open video: {self.video_path}")
+        
+        fps = self.probe.fps
+        frame_count = self.probe.frame_count
+        
+        # Split the sample grid into contiguous segments aligned to frame_interval
+        sample_count = (frame_count + frame_interval - 1) // frame_interval
+        workers = max(1, min(workers, sample_count))
+        bounds = [round(i * sample_count / workers) * frame_interval for i in range(workers + 1)]
+        bounds[-1] = frame_count
+        
+        logger.info(f"Analyzing video for key frames in {workers} parallel segments...")
+        
+        # Spawned workers start clean; forking would copy the bot's threads, locks and open captures
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [
+                pool.submit(_score_segment_worker, self.video_path, self.frames_dir.parent, self.scorer,
+                            self.motion_engine, self.probe, bounds[i], bounds[i + 1], frame_interval,
+                            decode_mode, proxy_width)
+                for i in range(workers)
+                if bounds[i] < bounds[i + 1]
+            ]
+            candidates = [candidate for future in futures for candidate in future.result()]
+        
+        candidates.sort(key=lambda candidate: candidate[0])
+        scored = (
+            (SampledFrame(frame_number, timestamp, None), frame_diff, motion_score)
+            for frame_number, timestamp, frame_diff, motion_score in candidates
+        )
+        saved_frames = self._select(selection, scored, frame_count, min_scene_change, min_motion_threshold, max_frames)
+        
+        self._write_pending_full_frames(cap, fps)
         cap.release()
         logger.info(f"Extracted {len(saved_frames)} key frames")
         return saved_frames
-
-    def _process_frame_batch(
+    
+    def extract_keyframes(
         self,
-        frame_buffer: List[Tuple[np.ndarray, float]],
-        saved_frames: List[Path],
-        min_scene_change: float,
-        min_motion_threshold: float
-    ):
-        """Process a batch of frames efficiently."""
-        for i, (frame, timestamp) in enumerate(frame_buffer):
-            if i > 0:
-                prev_frame = frame_buffer[i-1][0]
-                frame_diff = self._compute_frame_difference(frame, prev_frame)
-                motion_score = self._detect_motion(frame, prev_frame)
-                
-                if frame_diff > min_scene_change or motion_score > min_motion_threshold:
-                    frame_path = self.frames_dir / f"frame_{timestamp:.2f}s.jpg"
-                    cv2.imwrite(str(frame_path), frame)
-                    saved_frames.append(frame_path)
-                    
-                    if frame_diff > min_scene_change:
-                        self.scene_changes.append(frame_path)
-                    self.motion_scores.append((frame_path, motion_score))
-                    
-                    logger.info(f"Saved frame at {timestamp:.2f}s (scene_change={frame_diff > min_scene_change}, "
-                              f"motion={motion_score:.2f}")
+        min_scene_change: float = 30.0,
+        min_motion_threshold: float = 2.0,
+        max_frames: int = 4,
+        frame_interval: int = 5,
+        proxy_width: Optional[int] = DEFAULT_PROXY_WIDTH,
+        selection: str = "greedy",
+        refine_window: float = 0.0
+    ) -> List[Path]:
+        """
+        Extract key frames from a first pass over codec keyframes (I-frames) only.
+        
+        Encoders usually place keyframes at shot boundaries, so scoring consecutive
+        keyframes finds most cuts while decoding a small fraction of the video.
+        Keyframes are seconds apart, so only the scene-change score is computed on
+        them. With refine_window > 0, the best max_frames keyframes are refined by
+        densely scoring every frame_interval-th frame within refine_window seconds
+        around each of them, and selection runs over keyframes and refined frames.
+        
+        Args:
+            refine_window: Half-width in seconds of the dense window around each candidate
+            (other arguments as in extract_frames)
+        """
+        cap = cv2.VideoCapture(str(self.video_path))
+        if not cap.isOpened():
+            raise ValueError(f"Could not open video: {self.video_path}")
+        
+        fps = self.probe.fps
+        frame_count = self.probe.frame_count
+        source_width = self.probe.width
+        
+        keyframe_times = self.probe.keyframe_times
+        if keyframe_times is None:
+            try:
+                keyframe_times = self.probe.keyframe_times = list_keyframe_times(self.video_path)
+            except (OSError, subprocess.CalledProcessError) as e:
+                logger.warning(f"Could not list keyframes: {str(e)}")
+        if not keyframe_times:
+            logger.warning("No keyframes to analyze, falling back to dense frame extraction")
+            cap.release()
+            return self.extract_frames(
+                min_scene_change=min_scene_change,
+                min_motion_threshold=min_motion_threshold,
+                max_frames=max_frames,
+                frame_interval=frame_interval,
+                proxy_width=proxy_width,
+                selection=selection
+            )
+        logger.info(f"Analyzing {len(keyframe_times)} keyframes for key frames...")
+        
+        source = KeyframeSource(self.video_path, keyframe_times, self.probe.size, proxy_width or source_width)
+        self.proxy_scale = source_width / source.width if source.width else 1.0
+        samples = (
+            SampledFrame(min(int(round(timestamp * fps)), max(frame_count - 1, 0)), timestamp, None, proxy)
+            for timestamp, proxy in source
+        )
+        candidates = {
+            sample.frame_number: (sample.frame_number, sample.timestamp, frame_diff, motion_score)
+            for sample, frame_diff, motion_score in self._score_samples(
+                samples, self.scorer.batch_size, with_motion=False
+            )
+        }
+        
+        if refine_window > 0 and candidates:
+            best = sorted(candidates.values(), key=lambda c: c[2], reverse=True)[:max_frames]
+            for frame_number, timestamp, frame_diff, _ in best:
+                start_frame = max(0, int((timestamp - refine_window) * fps) // frame_interval * frame_interval)
+                end_frame = min(frame_count, int(np.ceil((timestamp + refine_window) * fps)) + 1)
+                for candidate in self.score_segment(start_frame, end_frame, frame_interval, "sequential", proxy_width):
+                    candidates.setdefault(candidate[0], candidate)
+            logger.info(f"Refined {len(best)} keyframe candidates to {len(candidates)} scored frames")
+        
+        scored = (
+            (SampledFrame(frame_number, timestamp, None), frame_diff, motion_score)
+            for frame_number, timestamp, frame_diff, motion_score in sorted(candidates.values())
+        )
+        saved_frames = self._select(selection, scored, frame_count, min_scene_change, min_motion_threshold, max_frames)
+        
+        self._write_pending_full_frames(cap, fps)
+        cap.release()
+        logger.info(f"Extracted {len(saved_frames)} key frames")
+        return saved_frames
+    
+    def _save_frame(self, frame_path: Path, sample: SampledFrame, frame_diff: float = 0.0,
+                    motion_score: float = 0.0):
+        """Write a selected frame, deferring analysis-only samples to a full-resolution decode."""
+        self.saved_frame_scores[frame_path] = (sample.timestamp, float(frame_diff), float(motion_score))
+        if sample.frame is not None:
+            self._write_frame(frame_path, sample.frame, sample.timestamp, frame_diff, motion_score)
+        else:
+            self.pending_full_frames.append((frame_path, sample.timestamp, frame_diff, motion_score))
+    
+    def set_memory_budget(self, budget_mb: Optional[float], monitor: Optional[MemoryMonitor] = None):
+        """
+        Enable bounded-memory mode.
+        
+        Decoding reuses preallocated arrays, full-resolution frames are only kept
+        for the frames being encoded, and the encode queue holds at most as many
+        frames as fit in RESIDENT_FRAME_SHARE of the budget.
+        
+        Args:
+            budget_mb: Memory budget in megabytes, None disables bounded-memory mode
+            monitor: Memory monitor sampling this job's resident memory
+        """
+        self.memory_budget_mb = budget_mb
+        self.memory_monitor = monitor
+        if budget_mb is None:
+            self.max_resident_frames = None
+            return
+        frame_bytes = max(1, self.probe.width * self.probe.height * 3)
+        resident = int(budget_mb * 1024 * 1024 * RESIDENT_FRAME_SHARE // frame_bytes)
+        self.max_resident_frames = max(1, min(ENCODE_THREADS, resident))
+        logger.debug(f"Bounded-memory mode: {budget_mb:.0f} MB budget, "
+                     f"{self.max_resident_frames} resident full-resolution frames")
+    
+    def extract_indexed_frames(self, shot_index: ShotIndex) -> List[Path]:
+        """
+        Write the key frames recorded in a shot index without scoring the video.
+        
+        Only the key frames themselves are decoded, so a re-run with the same
+        parameters skips the whole decode -> proxy -> score pipeline.
+        """
+        cap = cv2.VideoCapture(str(self.video_path))
+        if not cap.isOpened():
+            raise ValueError(f"Could not open video: {self.video_path}")
+        
+        logger.info(f"Writing {len(shot_index.key_times)} key frames from the shot index...")
+        saved_frames = []
+        for timestamp, frame_diff, motion_score, is_scene_change in zip(
+            shot_index.key_times.tolist(), shot_index.key_scene_scores.tolist(),
+            shot_index.key_motion_scores.tolist(), shot_index.key_scene_changes.tolist()
+        ):
+            frame_path = self._frame_path(timestamp)
+            self._save_frame(frame_path, SampledFrame(int(round(timestamp * self.probe.fps)), timestamp, None),
+                             frame_diff, motion_score)
+            saved_frames.append(frame_path)
+            if is_scene_change:
+                self.scene_changes.append(frame_path)
+            self.motion_scores.append((frame_path, motion_score))
+        
+        self._write_pending_full_frames(cap, self.probe.fps)
+        cap.release()
+        return saved_frames
+    
+    def build_shot_index(self, saved_frames: List[Path], min_scene_change: float, params: str = "{}") -> ShotIndex:
+        """
+        Build the shot index of the samples scored so far and the given saved frames.
+        
+        Greedy selection stops scoring once max_frames frames are saved, so its
+        index only covers the video up to the last saved frame.
+        """
+        scene_changes = set(self.scene_changes)
+        key_frames = [
+            (frame_path,) + self.saved_frame_scores[frame_path] + (frame_path in scene_changes,)
+            for frame_path in saved_frames
+            if frame_path in self.saved_frame_scores
+        ]
+        return build_shot_index(self.sample_records, key_frames, min_scene_change, params)
+    
+    def _frame_path(self, timestamp: float) -> Path:
+        """Path of the saved frame at a timestamp, with the output profile's extension."""
+        return self.frames_dir / f"frame_{timestamp:.2f}s{self.output_profile.extension}"
+    
+    def _write_frame(self, frame_path: Path, frame: np.ndarray, timestamp: float, frame_diff: float,
+                     motion_score: float):
+        """
+        Queue hashing and encoding of a saved frame on the encode pool.
+        
+        In bounded-memory mode at most max_resident_frames frames wait in the
+        queue, and none once the memory monitor reports the budget exceeded.
+        """
+        if self.max_resident_frames is not None:
+            over_budget = self.memory_monitor is not None and self.memory_monitor.over_budget
+            limit = 0 if over_budget else self.max_resident_frames - 1
+            while len(self.pending_writes) > limit:
+                self.pending_writes.pop(0).result()
+        self.pending_writes.append(_get_encode_pool().submit(
+            self._encode_frame, frame_path, frame, timestamp, frame_diff, motion_score
+        ))
+    
+    def _encode_frame(self, frame_path: Path, frame: np.ndarray, timestamp: float, frame_diff: float,
+                      motion_score: float):
+        """Hash a frame and encode it into the frame store, or write it to disk without one."""
+        hashes, brightness = dhash_batch([frame])
+        self.frame_hashes[frame_path] = (hashes[0], brightness[0])
+        data = self.output_profile.encode(frame)
+        if data is None:
+            logger.warning(f"Could not encode frame at {timestamp:.2f}s")
+            return
+        if self.frame_store is None:
+            with open(frame_path, "wb") as f:
+                f.write(data)
+        else:
+            self.frame_store.put(frame_path, data, timestamp, frame_diff, motion_score)
+    
+    def _write_pending_full_frames(self, cap: cv2.VideoCapture, fps: float):
+        """
+        Decode full-resolution frames for timestamps selected on analysis frames,
+        then wait until every saved frame is encoded.
+        """
+        for frame_path, timestamp, frame_diff, motion_score in sorted(self.pending_full_frames,
+                                                                      key=lambda item: item[1]):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(round(timestamp * fps)))
+            ret, frame = cap.read()
+            if not ret:
+                logger.warning(f"Could not decode full-resolution frame at {timestamp:.2f}s")
+                continue
+            self._write_frame(frame_path, frame, timestamp, frame_diff, motion_score)
+        self.pending_full_frames = []
+        
+        for future in self.pending_writes:
+            future.result()
+        self.pending_writes = []
+    
+    def remove_duplicates(self, saved_frames: List[Path], max_distance: int = DEFAULT_DEDUP_DISTANCE) -> List[Path]:
+        """
+        Drop saved frames that are near-duplicates of an earlier saved frame.
+        
+        Static intros, slideshows and loops can yield several nearly identical key
+        frames; each one would cost its own vision API calls. Frames whose dHash is
+        within max_distance bits of an earlier kept frame, at a similar brightness,
+        are removed from the results, the frame store and disk.
+        
+        Returns:
+            The saved frames that were kept, in their original order
+        """
+        hashed = [frame_path for frame_path in saved_frames if frame_path in self.frame_hashes]
+        if len(hashed) < 2:
+            return saved_frames
+        
+        hashes = np.stack([self.frame_hashes[frame_path][0] for frame_path in hashed])
+        brightness = np.array([self.frame_hashes[frame_path][1] for frame_path in hashed])
+        similar = ((hamming_distances(hashes) <= max_distance)
+                   & (np.abs(brightness[:, None] - brightness[None, :]) <= DEDUP_BRIGHTNESS_TOLERANCE))
+        kept, duplicates = [], set()
+        for i, frame_path in enumerate(hashed):
+            if similar[i, kept].any():
+                duplicates.add(frame_path)
+            else:
+                kept.append(i)
+        if not duplicates:
+            return saved_frames
+        
+        for frame_path in duplicates:
+            if self.frame_store is not None:
+                self.frame_store.discard(frame_path)
+            frame_path.unlink(missing_ok=True)
+            del self.frame_hashes[frame_path]
+        self.scene_changes = [p for p in self.scene_changes if p not in duplicates]
+        self.motion_scores = [(p, score) for p, score in self.motion_scores if p not in duplicates]
+        
+        logger.info(f"Removed {len(duplicates)} near-duplicate frames, "
+                    f"saving {len(duplicates)} vision API calls")
+        return [frame_path for frame_path in saved_frames if frame_path not in duplicates]
     
     def get_scene_changes(self) -> List[Path]:
         """Get list of frames where scene changes were detected."""
@@ -204,22 +1298,87 @@ class FrameExtractor:
         """Get motion scores for saved frames."""
         return self.motion_scores
 
+def _score_segment_worker(
+    video_path: Path,
+    output_dir: Path,
+    scorer: FrameScorer,
+    motion_engine: str,
+    probe: VideoProbe,
+    start_frame: int,
+    end_frame: int,
+    frame_interval: int,
+    decode_mode: str,
+    proxy_width: Optional[int]
+) -> List[Tuple[int, float, float, float]]:
+    """Process pool entry point that scores one video segment."""
+    return FrameExtractor(video_path, output_dir, scorer, motion_engine, probe).score_segment(
+        start_frame, end_frame, frame_interval, decode_mode, proxy_width
+    )
+
 def execute_step(
     video_file: Path,
     output_dir: Path,
-    min_scene_change: float = 30.0,
+    min_scene_change: Optional[float] = None,
     min_motion_threshold: float = 2.0,
-    max_frames: int = 12  # Increased from 4 to 12
-) -> Tuple[List[Path], List[Path], List[Tuple[Path, float]], float, dict]:
+    max_frames: int = 12,  # Increased from 4 to 12
+    decode_mode: str = "sequential",
+    backend: str = "opencv",
+    proxy_width: Optional[int] = DEFAULT_PROXY_WIDTH,
+    workers: int = 1,
+    selection: str = "greedy",
+    scorer: str = "absdiff",
+    refine_window: float = 0.0,
+    auto_calibrate: bool = False,
+    sample_budget: int = DEFAULT_SAMPLE_BUDGET,
+    motion_engine: str = "farneback",
+    object_weight: float = 0.0,
+    audio_weight: float = 0.0,
+    probe: Optional[VideoProbe] = None,
+    frame_store: Optional[FrameStore] = None,
+    dedup_distance: Optional[int] = DEFAULT_DEDUP_DISTANCE,
+    output_profile: str = "full",
+    reuse_shot_index: bool = True,
+    memory_budget_mb: Optional[float] = None
+) -> Tuple[List[Path], List[Path], List[Tuple[Path, float]], float, dict, ShotIndex]:
     """
     Execute frame extraction step.
     
     Args:
         video_file: Path to video file
         output_dir: Directory to save frames
-        min_scene_change: Minimum difference for scene change detection
+        min_scene_change: Minimum difference for scene change detection, None for the scorer's
+            default_scene_change
         min_motion_threshold: Minimum score for motion detection
         max_frames: Maximum number of frames to extract
+        decode_mode: Frame decoding strategy ("sequential" or "seek")
+        backend: Frame source ("opencv", "ffmpeg" for downscaled grayscale scoring,
+            or "keyframes" to score codec keyframes only)
+        proxy_width: Width of the grayscale proxy frames used for scoring (None keeps full resolution)
+        workers: Number of parallel segment workers; values above 1 split the video
+            into time segments scored in separate processes (opencv backend only)
+        selection: Frame selection mode ("greedy" or "topk" over the whole video)
+        scorer: Scene-change scorer name ("absdiff" or "histogram")
+        refine_window: Seconds around the best keyframes to score densely (keyframes backend only)
+        auto_calibrate: Derive the sampling interval from fps and duration to fit sample_budget,
+            and raise thresholds to a running percentile of the score distribution
+        sample_budget: Number of frames to score per video when auto-calibrating
+        motion_engine: Motion estimator ("farneback", "lk" sparse Lucas-Kanade, or "phase" correlation)
+        object_weight: Score boost per detected face or body (up to 3) on candidate frames, 0 disables it;
+            ignored with workers > 1
+        audio_weight: Weight of the audio energy envelope in frame scores, 0 disables it; scores are
+            scaled from 1 - audio_weight in silence to 1 + audio_weight at loud moments and sound onsets
+        probe: Shared video metadata from probe_video, probed here when not given
+        frame_store: Keep saved frames encoded in memory for frame analysis instead of
+            writing them to disk (frames over the store's memory budget still spill to disk)
+        dedup_distance: Maximum dHash Hamming distance (of 64 bits) at which a saved frame counts as a
+            near-duplicate of an earlier one and is dropped before frame analysis (None disables it)
+        output_profile: Size and encoding of saved frames ("full" JPEG at source resolution,
+            "vision" JPEG downscaled for the vision APIs, or "webp")
+        reuse_shot_index: Write the key frames from the shot index sidecar of a previous run with
+            the same parameters instead of scoring the video again
+        memory_budget_mb: Resident memory this job may add, in megabytes; enables bounded-memory mode,
+            which reuses decode buffers and caps the full-resolution frames held at once (None disables it).
+            Peak memory is logged either way.
         
     Returns:
         Tuple containing:
@@ -228,6 +1387,7 @@ def execute_step(
         - List of tuples containing (frame path, motion score)
         - Video duration in seconds
         - Video metadata dictionary
+        - Shot index (also saved next to the video as <video name>.shots.npz)
     """
     logger.debug("Step 2: Extracting frames...")
     
@@ -244,28 +1404,105 @@ def execute_step(
             logger.warning(f"Error loading metadata: {str(e)}")
     
     # Get video duration
-    cap = cv2.VideoCapture(str(video_file))
-    if not cap.isOpened():
-        raise ValueError(f"Could not open video: {video_file}")
-    
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    duration = frame_count / fps if fps > 0 else 0
-    cap.release()
-    
-    frame_extractor = FrameExtractor(video_file, output_dir)
-    key_frames = frame_extractor.extract_frames(
-        min_scene_change=min_scene_change,
-        min_motion_threshold=min_motion_threshold,
-        max_frames=max_frames,
-        frame_interval=3  # Reduced from 5 to 3 to sample more frequently
+    if probe is None:
+        probe = probe_video(video_file, with_keyframes=backend == "keyframes")
+    fps = probe.fps
+    frame_count = probe.frame_count
+    duration = probe.duration
+    
+    frame_scorer = get_scorer(scorer)
+    if min_scene_change is None:
+        min_scene_change = frame_scorer.default_scene_change
+    frame_extractor = FrameExtractor(video_file, output_dir, frame_scorer, motion_engine, probe)
+    frame_extractor.object_weight = object_weight
+    frame_extractor.audio_weight = audio_weight
+    frame_extractor.frame_store = frame_store
+    frame_extractor.output_profile = get_output_profile(output_profile)
+    frame_interval = 3  # Reduced from 5 to 3 to sample more frequently
+    if auto_calibrate:
+        frame_interval = calibrate_frame_interval(fps, frame_count, sample_budget)
+        frame_extractor.threshold_percentile = ADAPTIVE_PERCENTILE
+        logger.debug(f"Calibrated frame interval {frame_interval} for {fps:.1f} fps, {duration:.1f}s video")
+    
+    # Parameters that change which frames are selected; a shot index is reused only if they match
+    params = params_signature(
+        min_scene_change=min_scene_change, min_motion_threshold=min_motion_threshold, max_frames=max_frames,
+        decode_mode=decode_mode, backend=backend, proxy_width=proxy_width, selection=selection, scorer=scorer,
+        refine_window=refine_window, frame_interval=frame_interval, adaptive=auto_calibrate,
+        motion_engine=motion_engine, object_weight=object_weight, audio_weight=audio_weight,
+        dedup_distance=dedup_distance
     )
+    shot_index = load_shot_index(video_file, params) if reuse_shot_index else None
+    
+    # Decode the audio track once at a low sample rate for the energy envelope
+    if audio_weight > 0 and shot_index is None:
+        frame_extractor.audio_envelope = compute_audio_envelope(video_file)
+        if frame_extractor.audio_envelope is None:
+            logger.debug("No usable audio track, selecting frames on video signals only")
+    
+    monitor = MemoryMonitor(memory_budget_mb)
+    frame_extractor.set_memory_budget(memory_budget_mb, monitor)
+    with monitor:
+        if shot_index is not None:
+            key_frames = frame_extractor.extract_indexed_frames(shot_index)
+        elif backend == "keyframes":
+            key_frames = frame_extractor.extract_keyframes(
+                min_scene_change=min_scene_change,
+                min_motion_threshold=min_motion_threshold,
+                max_frames=max_frames,
+                frame_interval=frame_interval,
+                proxy_width=proxy_width,
+                selection=selection,
+                refine_window=refine_window
+            )
+        elif workers > 1:
+            if backend != "opencv":
+                logger.warning(f"The {backend} backend is not used with parallel workers, segments are decoded with OpenCV")
+            if object_weight > 0:
+                logger.warning("object_weight has no effect with parallel workers, segments are scored without proxies")
+            key_frames = frame_extractor.extract_frames_parallel(
+                workers,
+                min_scene_change=min_scene_change,
+                min_motion_threshold=min_motion_threshold,
+                max_frames=max_frames,
+                frame_interval=frame_interval,
+                decode_mode=decode_mode,
+                proxy_width=proxy_width,
+                selection=selection
+            )
+        else:
+            key_frames = frame_extractor.extract_frames(
+                min_scene_change=min_scene_change,
+                min_motion_threshold=min_motion_threshold,
+                max_frames=max_frames,
+                frame_interval=frame_interval,
+                decode_mode=decode_mode,
+                backend=backend,
+                proxy_width=proxy_width,
+                selection=selection
+            )
+    
+    if monitor.peak_mb is not None:
+        logger.info(f"Frame extraction peak memory: {monitor.peak_mb:.0f} MB "
+                    f"(+{monitor.peak_growth_mb:.0f} MB over the {monitor.start_mb:.0f} MB at start)")
+        if memory_budget_mb is not None and monitor.peak_growth_mb > memory_budget_mb:
+            logger.warning(f"Frame extraction exceeded its {memory_budget_mb:.0f} MB memory budget")
+    
+    if shot_index is None:
+        if dedup_distance is not None:
+            key_frames = frame_extractor.remove_duplicates(key_frames, dedup_distance)
+        shot_index = frame_extractor.build_shot_index(key_frames, min_scene_change, params)
+        try:
+            shot_index.save(shot_index_path(video_file), video_file)
+        except OSError as e:
+            logger.warning(f"Could not save shot index: {str(e)}")
     
     scene_changes = frame_extractor.get_scene_changes()
     motion_scores = frame_extractor.get_motion_scores()
     
     logger.debug(f"Extracted {len(key_frames)} key frames")
     logger.debug(f"Detected {len(scene_changes)} scene changes")
+    logger.debug(f"Indexed {len(shot_index)} shots")
     logger.debug(f"Final video duration: {duration:.2f} seconds")
     
-    return key_frames, scene_changes, motion_scores, duration, metadata 
\ No newline at end of file
+    return key_frames, scene_changes, motion_scores, duration, metadata, shot_index 
\ No newline at end of file
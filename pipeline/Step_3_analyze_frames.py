@@ -3,6 +3,7 @@ Step 3: Frame analysis module
 Analyzes extracted frames using Google Vision and OpenAI Vision APIs
 """
 
+import asyncio
 import base64
 import json
 import logging
@@ -13,8 +14,35 @@ from typing import Dict, List, Optional, Tuple, Union
 from google.cloud import vision
 from openai import OpenAI
 
+from .frame_store import FrameStore
+from .shot_index import ShotIndex
+from .vision_cache import VisionCache, make_cache_key
+from .vision_payload import PayloadProfile, PayloadStats, PreparedPayload, get_payload_profile, prepare_payload
+
 logger = logging.getLogger(__name__)
 
+# Requests in flight at once per provider; the sync clients run in worker threads
+GOOGLE_VISION_CONCURRENCY = 8
+OPENAI_CONCURRENCY = 3
+
+# Google Vision batch_annotate_images limits: images per request, and image bytes per request
+# (kept under the API's request size limit, leaving room for base64 and request overhead)
+GOOGLE_VISION_BATCH_SIZE = 16
+GOOGLE_VISION_BATCH_BYTES = 7 * 1024 * 1024
+
+# Parts of the vision cache keys; bump OPENAI_PROMPT_VERSION when the prompt templates change
+GOOGLE_VISION_FEATURES = "labels:20,objects:20,image_properties"
+OPENAI_VISION_MODEL = "gpt-4o"
+OPENAI_PROMPT_VERSION = "1"
+
+# What the OpenAI Vision prompts ask for in each frame's analysis
+OPENAI_ANALYSIS_POINTS = """1. Describes the main focus or subject of {frame} in relation to the video's context
+2. Explains any actions, movements, or interactions visible in the frame
+3. Notes significant details that align with or add to the video's narrative
+4. Analyzes how this moment connects to the overall story being told in the description
+5. Corrects any potential misidentifications from computer vision (e.g., if an object was incorrectly labeled)
+6. Pay special attention to distinguishing between similar animals (e.g., deer vs dog, horse vs deer)"""
+
 def convert_numpy_floats(obj):
     """Convert any numpy float types to Python floats for JSON serialization."""
     if isinstance(obj, dict):
@@ -27,10 +55,27 @@ def convert_numpy_floats(obj):
         return float(obj)
     return obj
 
+def parse_frame_timestamp(frame_path: Union[Path, str]) -> float:
+    """
+    Parse the timestamp from a frame file name such as frame_12.34s.jpg or frame_12.34s.webp.
+    
+    Fallback for frames that neither the frame store nor the shot index knows.
+    """
+    return float(Path(frame_path).stem.split('_')[1].rstrip('s'))
+
 class VisionAnalyzer:
     """Handles image analysis using multiple vision APIs with optimized usage."""
     
-    def __init__(self, frames_dir: Path, output_dir: Path, metadata: Optional[dict] = None):
+    def __init__(self, frames_dir: Path, output_dir: Path, metadata: Optional[dict] = None,
+                 frame_store: Optional[FrameStore] = None,
+                 google_concurrency: int = GOOGLE_VISION_CONCURRENCY,
+                 openai_concurrency: int = OPENAI_CONCURRENCY,
+                 batch_google_vision: bool = True,
+                 openai_multi_frame: bool = True,
+                 openai_payload: Union[str, PayloadProfile] = "openai",
+                 google_payload: Union[str, PayloadProfile] = "google",
+                 cache: Optional[VisionCache] = None,
+                 shot_index: Optional[ShotIndex] = None):
         """
         Initialize vision analyzer.
         
@@ -38,19 +83,64 @@ class VisionAnalyzer:
             frames_dir: Directory containing frames to analyze
             output_dir: Directory to save analysis results
             metadata: Video metadata dictionary
+            frame_store: Encoded frames handed over by frame extraction, read before disk
+            google_concurrency: Maximum concurrent Google Vision requests
+            openai_concurrency: Maximum concurrent OpenAI requests
+            batch_google_vision: Send frames to Google Vision in batch requests instead of one request per frame
+            openai_multi_frame: Send the frames chosen for OpenAI in one multi-image request
+                instead of one request per frame
+            openai_payload: Size, quality and default detail level of the images sent to OpenAI
+                (a PayloadProfile or a profile name)
+            google_payload: Size and quality of the images sent to Google Vision
+            cache: Persistent cache of vision results, consulted before every API call
+            shot_index: Shot index from frame extraction, whose key frame timestamps are used
+                for frames missing from frame_store
         """
         self.frames_dir = Path(frames_dir)
         self.output_dir = Path(output_dir)
         self.metadata = convert_numpy_floats(metadata or {})
+        self.frame_store = frame_store
+        
+        # Timestamps of every key frame in the shot index, by file name
+        self.frame_times: Dict[str, float] = {}
+        if shot_index is not None:
+            self.frame_times = {
+                str(name): float(time) for name, time in zip(shot_index.key_frames, shot_index.key_times)
+            }
         
         # Initialize API clients
         self.vision_client = vision.ImageAnnotatorClient()
         self.openai_client = OpenAI()  # Initialize without explicit API key
         
+        # Bound the requests each provider sees at once
+        self.google_semaphore = asyncio.Semaphore(google_concurrency)
+        self.openai_semaphore = asyncio.Semaphore(openai_concurrency)
+        self.batch_google_vision = batch_google_vision
+        self.openai_multi_frame = openai_multi_frame
+        
+        # Per-provider payload preparation, and the bytes and tokens it saved
+        self.payload_profiles = {
+            "openai": get_payload_profile(openai_payload) if isinstance(openai_payload, str) else openai_payload,
+            "google": get_payload_profile(google_payload) if isinstance(google_payload, str) else google_payload
+        }
+        self.payload_stats = {provider: PayloadStats() for provider in self.payload_profiles}
+        self.cache = cache
+        
         # Analysis storage
         self.google_vision_results = {}
         self.openai_results = {}
     
+    def _frame_timestamp(self, frame_path: Union[Path, str]) -> float:
+        """Timestamp of a frame from the frame store or the shot index, parsed from its name otherwise."""
+        if self.frame_store is not None:
+            stored = self.frame_store.get(frame_path)
+            if stored is not None:
+                return stored.timestamp
+        frame_time = self.frame_times.get(Path(frame_path).name)
+        if frame_time is not None:
+            return frame_time
+        return parse_frame_timestamp(frame_path)
+    
     def select_key_frames(self, scene_changes: List[Union[Path, str]], motion_scores: List[Tuple[Union[Path, str], float]], max_frames: int = 12) -> List[Path]:
         """
         Select key frames for detailed analysis.
@@ -74,11 +164,11 @@ class VisionAnalyzer:
         for frame_path, _ in sorted_motion:
             if len(selected_frames) >= max_frames:
                 break
-                
+            
             # Check if frame is sufficiently different in time from selected frames
-            frame_time = float(frame_path.name.split('_')[1].replace('s.jpg', ''))
+            frame_time = self._frame_timestamp(frame_path)
             is_unique = all(
-                abs(float(f.name.split('_')[1].replace('s.jpg', '')) - frame_time) > 2.0
+                abs(self._frame_timestamp(f) - frame_time) > 2.0
                 for f in selected_frames
             )
             
@@ -87,122 +177,379 @@ class VisionAnalyzer:
         
         return selected_frames
     
+    def _read_frame(self, frame_path: Path) -> bytes:
+        """Read the encoded bytes of a frame from the frame store, or from disk without one."""
+        if self.frame_store is not None:
+            return self.frame_store.read_bytes(frame_path)
+        with open(frame_path, "rb") as image_file:
+            return image_file.read()
+    
+    def _prepare_frame(self, frame_path: Path, provider: str, detail: Optional[str] = None) -> PreparedPayload:
+        """Read a frame and resize and recompress it with the provider's payload profile."""
+        return prepare_payload(self._read_frame(frame_path), self.payload_profiles[provider], detail)
+    
+    def _cache_key(self, provider: str, payload: PreparedPayload, prompt: str = "", features: str = "") -> Optional[str]:
+        """Cache key of a request for a prepared frame, or None without a cache."""
+        if self.cache is None:
+            return None
+        if provider == "google":
+            return make_cache_key(payload.data, provider, GOOGLE_VISION_FEATURES)
+        return make_cache_key(payload.data, provider, f"{features},detail={payload.detail}",
+                              OPENAI_VISION_MODEL, OPENAI_PROMPT_VERSION, prompt)
+    
+    async def _cache_get(self, key: Optional[str], provider: str) -> Optional[dict]:
+        if key is None:
+            return None
+        return await asyncio.to_thread(self.cache.get, key, provider)
+    
+    async def _cache_put(self, key: Optional[str], provider: str, value: dict):
+        if key is not None:
+            await asyncio.to_thread(self.cache.put, key, provider, value)
+    
+    def _openai_image_part(self, payload: PreparedPayload) -> dict:
+        """Build the image_url message part for a prepared frame."""
+        self.payload_stats["openai"].add(payload)
+        base64_image = base64.b64encode(payload.data).decode('utf-8')
+        image_url = {"url": f"data:{payload.mime_type};base64,{base64_image}"}
+        if payload.detail:
+            image_url["detail"] = payload.detail
+        return {"type": "image_url", "image_url": image_url}
+    
+    def _google_vision_request(self, payload: PreparedPayload) -> "vision.AnnotateImageRequest":
+        """Build the Google Vision request for a prepared frame, with only the essential features."""
+        image = vision.Image(content=payload.data)
+        features = [
+            vision.Feature(type_=vision.Feature.Type.LABEL_DETECTION, max_results=20),
+            vision.Feature(type_=vision.Feature.Type.OBJECT_LOCALIZATION, max_results=20),
+            vision.Feature(type_=vision.Feature.Type.IMAGE_PROPERTIES)
+        ]
+        return vision.AnnotateImageRequest(image=image, features=features)
+    
+    @staticmethod
+    def _parse_google_vision_response(response) -> dict:
+        """Convert a Google Vision image response to the per-frame result (labels, objects, confidence)."""
+        # Enhanced object validation
+        validated_objects = []
+        for obj in response.localized_object_annotations:
+            # Higher confidence threshold for better accuracy
+            if obj.score >= 0.7:  
+                validated_objects.append({
+                    'name': str(obj.name),  # Ensure name is string
+                    'confidence': float(obj.score),
+                    'area': float(obj.bounding_poly.normalized_vertices[2].x * obj.bounding_poly.normalized_vertices[2].y)
+                })
+        
+        # Sort objects by area and confidence
+        validated_objects.sort(key=lambda x: (x['area'], x['confidence']), reverse=True)
+        
+        # Convert all values to basic Python types
+        result = {
+            "labels": [{'description': str(label.description), 'confidence': float(label.score)} 
+                      for label in response.label_annotations if label.score >= 0.7],
+            "objects": validated_objects,
+            "confidence": float(response.label_annotations[0].score) if response.label_annotations else 0.0
+        }
+        
+        return convert_numpy_floats(result)
+    
     async def analyze_frame_google_vision(self, frame_path: Path) -> Tuple[Optional[dict], bool]:
         """
         Analyze a frame using Google Vision API.
         Optimized to use only essential features.
+        The blocking client call runs in a worker thread, bounded by google_semaphore.
+        Results are served from and saved to the vision cache when one is set.
         """
         try:
-            with open(frame_path, "rb") as image_file:
-                content = image_file.read()
-            
-            image = vision.Image(content=content)
-            features = [
-                vision.Feature(type_=vision.Feature.Type.LABEL_DETECTION, max_results=20),
-                vision.Feature(type_=vision.Feature.Type.OBJECT_LOCALIZATION, max_results=20),
-                vision.Feature(type_=vision.Feature.Type.IMAGE_PROPERTIES)
-            ]
-            request = vision.AnnotateImageRequest(image=image, features=features)
-            response = self.vision_client.annotate_image(request)
-            
-            # Enhanced object validation
-            validated_objects = []
-            for obj in response.localized_object_annotations:
-                # Higher confidence threshold for better accuracy
-                if obj.score >= 0.7:  
-                    validated_objects.append({
-                        'name': str(obj.name),  # Ensure name is string
-                        'confidence': float(obj.score),
-                        'area': float(obj.bounding_poly.normalized_vertices[2].x * obj.bounding_poly.normalized_vertices[2].y)
-                    })
-            
-            # Sort objects by area and confidence
-            validated_objects.sort(key=lambda x: (x['area'], x['confidence']), reverse=True)
-            
-            # Convert all values to basic Python types
-            result = {
-                "labels": [{'description': str(label.description), 'confidence': float(label.score)} 
-                          for label in response.label_annotations if label.score >= 0.7],
-                "objects": validated_objects,
-                "confidence": float(response.label_annotations[0].score) if response.label_annotations else 0.0
-            }
+            payload = await asyncio.to_thread(self._prepare_frame, frame_path, "google")
+            key = self._cache_key("google", payload)
+            cached = await self._cache_get(key, "google")
+            if cached is not None:
+                return cached, True
             
-            return convert_numpy_floats(result), True
+            self.payload_stats["google"].add(payload)
+            result, success = await self._annotate_google_vision(frame_path, payload)
+            if success:
+                await self._cache_put(key, "google", result)
+            return result, success
         except Exception as e:
             logger.error(f"Google Vision API error: {str(e)}")
             return None, False
     
-    async def analyze_frame_openai(self, frame_path: Path, google_analysis: Optional[dict] = None) -> Tuple[Optional[dict], bool]:
+    async def _annotate_google_vision(self, frame_path: Path, payload: PreparedPayload) -> Tuple[Optional[dict], bool]:
+        """Send one prepared frame to Google Vision, without consulting the cache or counting the payload."""
+        try:
+            request = self._google_vision_request(payload)
+            async with self.google_semaphore:
+                response = await asyncio.to_thread(self.vision_client.annotate_image, request)
+            return self._parse_google_vision_response(response), True
+        except Exception as e:
+            logger.error(f"Google Vision API error for {frame_path.name}: {str(e)}")
+            return None, False
+    
+    async def analyze_frames_google_vision(self, frame_paths: List[Path]) -> List[Tuple[Optional[dict], bool]]:
+        """
+        Analyze frames with as few Google Vision requests as possible.
+        
+        Frames are packed into batch_annotate_images calls of at most
+        GOOGLE_VISION_BATCH_SIZE images and GOOGLE_VISION_BATCH_BYTES of image
+        data. Each response is mapped back to its frame; a frame whose response
+        carries an error fails on its own. A batch that fails as a whole is
+        retried frame by frame with the payloads already prepared. Frames found
+        in the vision cache are not sent, and each payload counts once in the
+        payload stats.
+        
+        Returns:
+            (result, success) for each frame, in the order of frame_paths
+        """
+        try:
+            payloads = await asyncio.to_thread(
+                lambda: [self._prepare_frame(frame_path, "google") for frame_path in frame_paths]
+            )
+        except OSError as e:
+            logger.error(f"Could not read frames for Google Vision: {str(e)}")
+            return await asyncio.gather(*(self.analyze_frame_google_vision(p) for p in frame_paths))
+        
+        keys = [self._cache_key("google", payload) for payload in payloads]
+        cached = await asyncio.gather(*(self._cache_get(key, "google") for key in keys))
+        results = [(result, True) if result is not None else None for result in cached]
+        
+        # Only frames missing from the cache are sent
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+        frame_paths = [frame_paths[i] for i in pending]
+        payloads = [payloads[i] for i in pending]
+        requests = [self._google_vision_request(payload) for payload in payloads]
+        
+        # Split into batches by image count and payload size
+        batches = []
+        batch_start, batch_bytes = 0, 0
+        for i, request in enumerate(requests):
+            size = len(request.image.content)
+            if i > batch_start and (i - batch_start >= GOOGLE_VISION_BATCH_SIZE
+                                    or batch_bytes + size > GOOGLE_VISION_BATCH_BYTES):
+                batches.append((batch_start, i))
+                batch_start, batch_bytes = i, 0
+            batch_bytes += size
+        if requests:
+            batches.append((batch_start, len(requests)))
+        
+        async def run_batch(start: int, end: int) -> List[Tuple[Optional[dict], bool]]:
+            for payload in payloads[start:end]:
+                self.payload_stats["google"].add(payload)
+            try:
+                async with self.google_semaphore:
+                    response = await asyncio.to_thread(
+                        self.vision_client.batch_annotate_images, requests=requests[start:end]
+                    )
+            except Exception as e:
+                logger.warning(f"Google Vision batch request failed, retrying frame by frame: {str(e)}")
+                return await asyncio.gather(*(
+                    self._annotate_google_vision(frame_path, payload)
+                    for frame_path, payload in zip(frame_paths[start:end], payloads[start:end])
+                ))
+            
+            results = []
+            for frame_path, image_response in zip(frame_paths[start:end], response.responses):
+                if image_response.error.message:
+                    logger.error(f"Google Vision API error for {frame_path.name}: {image_response.error.message}")
+                    results.append((None, False))
+                    continue
+                try:
+                    results.append((self._parse_google_vision_response(image_response), True))
+                except Exception as e:
+                    logger.error(f"Google Vision API error for {frame_path.name}: {str(e)}")
+                    results.append((None, False))
+            return results
+        
+        batch_results = await asyncio.gather(*(run_batch(start, end) for start, end in batches))
+        logger.debug(f"Google Vision: {len(frame_paths)} frames in {len(batches)} batch requests")
+        
+        sent_results = [result for batch in batch_results for result in batch]
+        for i, (result, success) in zip(pending, sent_results):
+            results[i] = (result, success)
+            if success:
+                await self._cache_put(keys[i], "google", result)
+        return results
+    
+    async def analyze_frame_openai(self, frame_path: Path, google_analysis: Optional[dict] = None,
+                                   detail: Optional[str] = None) -> Tuple[Optional[dict], bool]:
         """
         Analyze a frame using OpenAI Vision API.
         Provides detailed scene understanding.
+        The blocking client call runs in a worker thread, bounded by openai_semaphore.
+        The frame is sent at the given detail level ("low", "high" or "auto"),
+        defaulting to the detail level of the OpenAI payload profile.
+        Results are served from and saved to the vision cache when one is set.
         """
         try:
-            with open(frame_path, "rb") as image_file:
-                base64_image = base64.b64encode(image_file.read()).decode('utf-8')
+            payload = await asyncio.to_thread(self._prepare_frame, frame_path, "openai", detail)
             
             # Convert google_analysis to ensure it's JSON serializable
             if google_analysis:
                 google_analysis = convert_numpy_floats(google_analysis)
+            prompt = self._build_openai_prompt(google_analysis)
             
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": self._build_openai_prompt(google_analysis)},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{base64_image}",
-                                },
-                            },
-                        ],
-                    }
-                ],
-                max_tokens=300,
-            )
+            key = self._cache_key("openai", payload, prompt)
+            cached = await self._cache_get(key, "openai")
+            if cached is not None:
+                return cached, True
             
-            return {"detailed_description": response.choices[0].message.content}, True
+            async with self.openai_semaphore:
+                response = await asyncio.to_thread(
+                    self.openai_client.chat.completions.create,
+                    model=OPENAI_VISION_MODEL,
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": [
+                                {"type": "text", "text": prompt},
+                                self._openai_image_part(payload),
+                            ],
+                        }
+                    ],
+                    max_tokens=300,
+                )
+            
+            result = {"detailed_description": response.choices[0].message.content}
+            await self._cache_put(key, "openai", result)
+            return result, True
         except Exception as e:
             logger.error(f"OpenAI Vision API error: {str(e)}")
             return None, False
     
-    def _build_openai_prompt(self, google_analysis: Optional[dict] = None) -> str:
-        """Build prompt for OpenAI Vision API analysis."""
-        prompt = f"""Analyze this frame in detail, considering both the visual content and the following context:
-
-Video Title: {self.metadata.get('title', 'Unknown')}
-Description: {self.metadata.get('description', 'No description available')}
-
-Previous computer vision analysis detected:"""
+    async def analyze_frames_openai(self, frame_paths: List[Path], google_analysis: Optional[dict] = None,
+                                    details: Optional[List[Optional[str]]] = None) -> List[Tuple[Optional[dict], bool]]:
+        """
+        Analyze several frames with a single OpenAI Vision request.
+        
+        All frames go into one message as separate image parts, after one shared
+        prompt, and the model answers with a JSON object holding one description
+        per frame. The prompt and the request latency are paid once instead of
+        once per frame. If the answer cannot be mapped back to the frames, they
+        are analyzed one request each. Descriptions are cached per frame under
+        the shared prompt, so the request is skipped only when every frame hits.
         
+        Args:
+            frame_paths: Frames to analyze
+            google_analysis: Aggregated Google Vision labels and objects of the video
+            details: Detail level of each frame, None entries use the payload profile's
+        
+        Returns:
+            (result, success) for each frame, in the order of frame_paths, with
+            results shaped like analyze_frame_openai's
+        """
+        details = details or [None] * len(frame_paths)
+        if len(frame_paths) < 2:
+            return list(await asyncio.gather(*(
+                self.analyze_frame_openai(p, google_analysis, d) for p, d in zip(frame_paths, details)
+            )))
+        
+        try:
+            if google_analysis:
+                google_analysis = convert_numpy_floats(google_analysis)
+            
+            payloads = await asyncio.to_thread(
+                lambda: [self._prepare_frame(p, "openai", d) for p, d in zip(frame_paths, details)]
+            )
+            prompt = self._build_openai_multi_frame_prompt(frame_paths, google_analysis)
+            
+            keys = [
+                self._cache_key("openai", payload, prompt, f"frame {i} of {len(payloads)}")
+                for i, payload in enumerate(payloads, 1)
+            ]
+            cached = await asyncio.gather(*(self._cache_get(key, "openai") for key in keys))
+            if all(result is not None for result in cached):
+                return [(result, True) for result in cached]
+            
+            content = [{"type": "text", "text": prompt}]
+            content.extend(self._openai_image_part(payload) for payload in payloads)
+            
+            async with self.openai_semaphore:
+                response = await asyncio.to_thread(
+                    self.openai_client.chat.completions.create,
+                    model=OPENAI_VISION_MODEL,
+                    messages=[{"role": "user", "content": content}],
+                    response_format={"type": "json_object"},
+                    max_tokens=300 * len(frame_paths),
+                )
+            
+            answer = json.loads(response.choices[0].message.content)
+            descriptions = {
+                int(frame["index"]): str(frame["description"])
+                for frame in answer.get("frames", [])
+                if frame.get("description")
+            }
+            missing = [i for i in range(1, len(frame_paths) + 1) if i not in descriptions]
+            if missing:
+                raise ValueError(f"no description for frames {missing}")
+            
+            logger.debug(f"Analyzed {len(frame_paths)} frames in one OpenAI request")
+            results = [{"detailed_description": descriptions[i]} for i in range(1, len(frame_paths) + 1)]
+            for key, result in zip(keys, results):
+                await self._cache_put(key, "openai", result)
+            return [(result, True) for result in results]
+        except Exception as e:
+            logger.warning(f"Multi-frame OpenAI analysis failed, analyzing frames one by one: {str(e)}")
+            return list(await asyncio.gather(*(
+                self.analyze_frame_openai(p, google_analysis, d) for p, d in zip(frame_paths, details)
+            )))
+    
+    def _build_openai_context(self, google_analysis: Optional[dict] = None) -> Tuple[str, str]:
+        """Build the video context and the earlier detections shared by the OpenAI Vision prompts."""
+        context = f"""Video Title: {self.metadata.get('title', 'Unknown')}
+Description: {self.metadata.get('description', 'No description available')}"""
+
+        detections = ""
         if google_analysis:
             if google_analysis.get("labels"):
-                prompt += "\nKey elements detected (with confidence):"
+                detections += "\nKey elements detected (with confidence):"
                 for label in google_analysis["labels"]:
-                    prompt += f"\n- {label['description']} ({label['confidence']:.2f})"
+                    detections += f"\n- {label['description']} ({label['confidence']:.2f})"
             
             if google_analysis.get("objects"):
-                prompt += "\n\nObjects detected (with confidence and relative size):"
+                detections += "\n\nObjects detected (with confidence and relative size):"
                 for obj in google_analysis["objects"]:
-                    prompt += f"\n- {obj['name']} (confidence: {obj['confidence']:.2f}, area: {obj['area']:.2f})"
+                    detections += f"\n- {obj['name']} (confidence: {obj['confidence']:.2f}, area: {obj['area']:.2f})"
         
-        prompt += """
+        return context, detections
+    
+    def _build_openai_multi_frame_prompt(self, frame_paths: List[Path], google_analysis: Optional[dict] = None) -> str:
+        """Build the prompt for analyzing several frames in one OpenAI Vision request."""
+        context, detections = self._build_openai_context(google_analysis)
+        frame_list = "".join(
+            f"\n- Frame {i}: at {self._frame_timestamp(frame_path):.1f}s" for i, frame_path in enumerate(frame_paths, 1)
+        )
+        return f"""Analyze each of the following {len(frame_paths)} frames from one video in detail, considering both the visual content and the following context:
+
+{context}
+
+The images follow in this order:{frame_list}
+
+Previous computer vision analysis of the video detected:{detections}
+
+For each frame, provide a comprehensive analysis that:
+{OPENAI_ANALYSIS_POINTS.format(frame="the frame")}
+
+Keep each analysis natural and focused on how the frame relates to the video's context.
+
+Respond with a JSON object of this form, with one entry per frame:
+{{"frames": [{{"index": 1, "description": "analysis of frame 1"}}, {{"index": 2, "description": "analysis of frame 2"}}]}}"""
+
+    def _build_openai_prompt(self, google_analysis: Optional[dict] = None) -> str:
+        """Build prompt for OpenAI Vision API analysis."""
+        context, detections = self._build_openai_context(google_analysis)
+        return f"""Analyze this frame in detail, considering both the visual content and the following context:
+
+{context}
+
+Previous computer vision analysis detected:{detections}
 
 Please provide a comprehensive analysis that:
-1. Describes the main focus or subject of this frame in relation to the video's context
-2. Explains any actions, movements, or interactions visible in the frame
-3. Notes significant details that align with or add to the video's narrative
-4. Analyzes how this moment connects to the overall story being told in the description
-5. Corrects any potential misidentifications from computer vision (e.g., if an object was incorrectly labeled)
-6. Pay special attention to distinguishing between similar animals (e.g., deer vs dog, horse vs deer)
+{OPENAI_ANALYSIS_POINTS.format(frame="this frame")}
 
 Keep the analysis natural and focused on how this frame relates to the video's context."""
-        
-        return prompt
-    
+
     async def analyze_video(self, scene_changes: List[Path], motion_scores: List[Tuple[Path, float]], video_duration: float) -> dict:
         """
         Main analysis workflow with optimized API usage.
@@ -223,16 +570,20 @@ Keep the analysis natural and focused on how this frame relates to the video's c
             logger.info(f"Selected {len(key_frames)} key frames for analysis")
             
             # Analyze all selected frames with Google Vision
+            if self.batch_google_vision:
+                google_analyses = await self.analyze_frames_google_vision(key_frames)
+            else:
+                google_analyses = await asyncio.gather(
+                    *(self.analyze_frame_google_vision(frame_path) for frame_path in key_frames)
+                )
             google_vision_results = []
-            for frame_path in key_frames:
+            for frame_path, (google_analysis, success) in zip(key_frames, google_analyses):
                 frame_result = {
                     "frame": frame_path.name,
-                    "timestamp": float(frame_path.name.split('_')[1].replace('s.jpg', '')),
+                    "timestamp": self._frame_timestamp(frame_path),
                     "path": str(frame_path)
                 }
                 
-                # Google Vision Analysis for all frames
-                google_analysis, success = await self.analyze_frame_google_vision(frame_path)
                 if success:
                     frame_result["google_vision"] = google_analysis
                     google_vision_results.append(frame_result)
@@ -265,21 +616,27 @@ Keep the analysis natural and focused on how this frame relates to the video's c
                                  key=lambda x: x["google_vision"].get("confidence", 0),
                                  reverse=True)[:3]
             
-            # OpenAI Vision Analysis for selected frames
-            for frame_data in openai_frames:
-                frame_path = self.frames_dir / frame_data["frame"]
-                
-                # Pass aggregated Google Vision results to OpenAI
-                openai_analysis, success = await self.analyze_frame_openai(
-                    frame_path,
-                    {
-                        "labels": all_labels,
-                        "objects": all_objects,
-                        "current_frame_objects": frame_data["google_vision"].get("objects", []),
-                        "current_frame_labels": frame_data["google_vision"].get("labels", [])
-                    }
+            # OpenAI Vision Analysis for selected frames, passing aggregated Google Vision results to OpenAI
+            if self.openai_multi_frame:
+                openai_analyses = await self.analyze_frames_openai(
+                    [self.frames_dir / frame_data["frame"] for frame_data in openai_frames],
+                    {"labels": all_labels, "objects": all_objects}
                 )
-                
+            else:
+                openai_analyses = await asyncio.gather(*(
+                    self.analyze_frame_openai(
+                        self.frames_dir / frame_data["frame"],
+                        {
+                            "labels": all_labels,
+                            "objects": all_objects,
+                            "current_frame_objects": frame_data["google_vision"].get("objects", []),
+                            "current_frame_labels": frame_data["google_vision"].get("labels", [])
+                        }
+                    )
+                    for frame_data in openai_frames
+                ))
+            
+            for frame_data, (openai_analysis, success) in zip(openai_frames, openai_analyses):
                 if success:
                     # Add OpenAI analysis to the frame
                     for frame in final_results["frames"]:
@@ -287,14 +644,26 @@ Keep the analysis natural and focused on how this frame relates to the video's c
                             frame["openai_vision"] = openai_analysis
                             break
             
+            # Complete when Google Vision analyzed every selected frame and OpenAI described every frame sent to it
+            openai_described = sum(1 for _, success in openai_analyses if success)
+            final_results["complete"] = (
+                bool(key_frames)
+                and len(google_vision_results) == len(key_frames)
+                and openai_described == len(openai_frames)
+            )
+            
             # Save results
             analysis_file = self.output_dir / "final_analysis.json"
             with open(analysis_file, 'w', encoding='utf-8') as f:
                 json.dump(convert_numpy_floats(final_results), f, indent=2, ensure_ascii=False)
             
             logger.info(f"Analysis complete. Results saved to {analysis_file}")
+            logger.info(f"Google Vision payloads: {self.payload_stats['google'].to_dict(with_tokens=False)}")
+            logger.info(f"OpenAI payloads: {self.payload_stats['openai'].to_dict()}")
+            if self.cache is not None:
+                logger.info(f"Vision cache: {self.cache.stats()}")
             return convert_numpy_floats(final_results)
-            
+        
         except Exception as e:
             logger.error(f"Error in analyze_video: {str(e)}")
             raise
@@ -305,7 +674,10 @@ async def execute_step(
     metadata: dict,
     scene_changes: List[Path],
     motion_scores: List[Tuple[Path, float]],
-    video_duration: float
+    video_duration: float,
+    frame_store: Optional[FrameStore] = None,
+    vision_cache: Optional[VisionCache] = None,
+    shot_index: Optional[ShotIndex] = None
 ) -> dict:
     """
     Execute frame analysis step.
@@ -317,7 +689,10 @@ async def execute_step(
         scene_changes: List of frames where scene changes were detected
         motion_scores: List of tuples containing (frame path, motion score)
         video_duration: Duration of the video in seconds
-        
+        frame_store: Encoded frames from frame extraction; frames not in the store are read from frames_dir
+        vision_cache: Persistent cache of Google Vision and OpenAI results, shared across jobs
+        shot_index: Shot index from frame extraction, the source of key frame timestamps with frame_store
+    
     Returns:
         Dictionary containing analysis results
     """
@@ -332,10 +707,12 @@ async def execute_step(
     video_duration = float(video_duration)
     
     # Initialize analyzer with metadata
-    analyzer = VisionAnalyzer(frames_dir, output_dir, metadata)
+    analyzer = VisionAnalyzer(frames_dir, output_dir, metadata, frame_store, cache=vision_cache, shot_index=shot_index)
     
     # Analyze video with provided parameters
     results = await analyzer.analyze_video(scene_changes, motion_scores, video_duration)
     
     logger.debug(f"Analyzed {len(results['frames'])} frames")
+    if frame_store is not None:
+        logger.debug(f"Frame store: {frame_store.stats()}")
     return results 
\ No newline at end of file
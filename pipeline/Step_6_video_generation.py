@@ -7,7 +7,7 @@ import os
 import logging
 import re
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
 import cloudinary
 import cloudinary.uploader
 import cloudinary.api
@@ -15,6 +15,8 @@ from cloudinary import CloudinaryVideo
 import requests
 import aiohttp
 
+from .video_probe import VideoProbe
+
 logger = logging.getLogger(__name__)
 
 class VideoGenerator:
@@ -159,7 +161,8 @@ class VideoGenerator:
                 logger.warning(f"Error cleaning up resource {resource_id}: {str(e)}")
         self.uploaded_resources = []
             
-    async def generate_video(self, video_id: str, audio_id: str, output_path: Path, style_name: str = None) -> Optional[Path]:
+    async def generate_video(self, video_id: str, audio_id: str, output_path: Path, style_name: str = None,
+                             dimensions: Optional[Tuple[int, int]] = None) -> Optional[Path]:
         """
         Generate final video with optimized processing.
         
@@ -168,6 +171,7 @@ class VideoGenerator:
             audio_id: Public ID of uploaded audio
             output_path: Path to save the final video
             style_name: Name of the commentary style used
+            dimensions: Known (width, height) of the video; fetched from Cloudinary when not given
             
         Returns:
             Path to generated video if successful, None otherwise
@@ -175,10 +179,13 @@ class VideoGenerator:
         try:
             video = CloudinaryVideo(video_id)
             
-            # Get video details
-            details = cloudinary.api.resource(video_id, resource_type='video')
-            width = details.get('width', 0)
-            height = details.get('height', 0)
+            # Get video details, only asking Cloudinary when the dimensions are unknown
+            if dimensions and all(dimensions):
+                width, height = dimensions
+            else:
+                details = cloudinary.api.resource(video_id, resource_type='video')
+                width = details.get('width', 0)
+                height = details.get('height', 0)
             
             logger.info(f"Processing video with style: {style_name}")
             logger.info(f"Video dimensions: {width}x{height}")
@@ -359,7 +366,8 @@ async def execute_step(
     video_file: Path,
     audio_file: Path,
     output_dir: Path,
-    style_name: str
+    style_name: str,
+    probe: Optional[VideoProbe] = None
 ) -> Optional[Path]:
     """
     Execute video generation step.
@@ -369,6 +377,7 @@ async def execute_step(
         audio_file: Path to the generated audio file
         output_dir: Directory to save generated video
         style_name: Name of the commentary style used
+        probe: Shared video metadata from probe_video, used for the video dimensions
         
     Returns:
         Path to the generated video if successful, None otherwise
@@ -394,13 +403,20 @@ async def execute_step(
         if not video_response or not audio_response:
             return None
         
+        # Reuse the probed dimensions, or those reported by the upload
+        if probe is not None:
+            dimensions = probe.size
+        else:
+            dimensions = (video_response.get('width', 0), video_response.get('height', 0))
+        
         # Generate final video
         output_file = output_dir / f"final_video_{style_name}.mp4"
         result = await generator.generate_video(
             video_response['public_id'],
             audio_response['public_id'],
             output_file,
-            style_name
+            style_name,
+            dimensions
         )
         
         return result
@@ -0,0 +1,131 @@
+"""
+Audio energy module
+Loudness and onset envelope of a video's audio track, used to prioritize key frames
+"""
+
+import logging
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Audio is decoded to mono at a low sample rate; loudness survives, and decoding stays cheap
+AUDIO_SAMPLE_RATE = 8000
+
+# Envelope resolution in seconds
+ENVELOPE_HOP = 0.05
+
+# Envelope values at this percentile of the clip map to full energy
+ENVELOPE_PERCENTILE = 95.0
+
+@dataclass
+class AudioEnvelope:
+    """
+    RMS loudness and onset strength of an audio track, sampled every hop seconds.
+    
+    Both curves are normalized to 0-1 against the clip itself, so a whisper-quiet
+    clip and a loud one rank their own moments the same way.
+    """
+    rms: np.ndarray
+    onset: np.ndarray
+    hop: float = ENVELOPE_HOP
+    
+    @property
+    def duration(self) -> float:
+        return len(self.rms) * self.hop
+    
+    @property
+    def energy(self) -> np.ndarray:
+        """Blend of loudness and onsets: loud moments and sudden sounds both count."""
+        return 0.5 * self.rms + 0.5 * self.onset
+    
+    def energy_at(self, timestamp: float, window: float = ENVELOPE_HOP * 4) -> float:
+        """
+        Peak energy within window seconds around a timestamp.
+        
+        The window absorbs the offset between a sound and the frame that shows it,
+        such as a laugh that follows the punchline.
+        """
+        if not len(self.rms):
+            return 0.0
+        start = max(0, int((timestamp - window) / self.hop))
+        end = min(len(self.rms), int((timestamp + window) / self.hop) + 1)
+        if start >= end:
+            return 0.0
+        return float(self.energy[start:end].max())
+
+def decode_audio(video_path: Union[str, Path], sample_rate: int = AUDIO_SAMPLE_RATE) -> Optional[np.ndarray]:
+    """
+    Decode the first audio stream of a video to mono float samples in -1..1.
+    
+    Returns:
+        Samples as a float32 array, or None if the video has no audio or ffmpeg fails
+    """
+    result = subprocess.run(
+        [
+            "ffmpeg", "-v", "error", "-nostdin",
+            "-i", str(video_path),
+            "-map", "0:a:0", "-vn", "-sn",
+            "-ac", "1", "-ar", str(sample_rate),
+            "-f", "s16le", "-acodec", "pcm_s16le",
+            "pipe:1"
+        ],
+        capture_output=True
+    )
+    if result.returncode != 0 or not result.stdout:
+        logger.debug(f"No audio decoded from {Path(video_path).name}: "
+                     f"{result.stderr.decode(errors='replace').strip()[:200]}")
+        return None
+    return np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+
+def compute_audio_envelope(
+    video_path: Union[str, Path],
+    sample_rate: int = AUDIO_SAMPLE_RATE,
+    hop: float = ENVELOPE_HOP
+) -> Optional[AudioEnvelope]:
+    """
+    Compute the RMS and onset envelope of a video's audio track.
+    
+    The onset curve is the rise in log loudness from one hop to the next,
+    which marks laughter, impacts and speech onsets that RMS alone blurs.
+    
+    Args:
+        video_path: Path to video file
+        sample_rate: Decode sample rate in Hz
+        hop: Envelope resolution in seconds
+    
+    Returns:
+        AudioEnvelope, or None if the video has no usable audio
+    """
+    try:
+        samples = decode_audio(video_path, sample_rate)
+    except OSError as e:
+        logger.warning(f"Could not run ffmpeg for audio: {str(e)}")
+        return None
+    
+    hop_samples = max(1, int(sample_rate * hop))
+    frames = len(samples) // hop_samples if samples is not None else 0
+    if frames < 2:
+        return None
+    
+    rms = np.sqrt(np.mean(np.square(samples[:frames * hop_samples].reshape(frames, hop_samples)), axis=1))
+    if rms.max() < 1e-4:
+        logger.debug("Audio track is silent")
+        return None
+    
+    log_rms = np.log10(rms + 1e-4)
+    onset = np.maximum(np.diff(log_rms, prepend=log_rms[0]), 0.0)
+    
+    def normalize(curve: np.ndarray) -> np.ndarray:
+        scale = np.percentile(curve, ENVELOPE_PERCENTILE)
+        if scale <= 0:
+            scale = curve.max() or 1.0
+        return np.clip(curve / scale, 0.0, 1.0).astype(np.float32)
+    
+    envelope = AudioEnvelope(rms=normalize(rms), onset=normalize(onset), hop=hop)
+    logger.debug(f"Audio envelope: {frames} hops over {envelope.duration:.1f}s")
+    return envelope
@@ -0,0 +1,224 @@
+"""
+Fingerprint index module
+Recognizes re-uploaded videos by perceptual hashes so their frame analysis can be reused
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+import cv2
+import numpy as np
+
+from .frame_encoding import DEDUP_BRIGHTNESS_TOLERANCE, dhash_batch
+from .video_probe import VideoProbe, probe_video
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_POINTS = 16       # Frames hashed per video, at fixed fractions of the duration
+MAX_MEAN_DISTANCE = 10.0      # Mean Hamming distance per point (of 64 bits) for a match
+MIN_DISTINCT_POINTS = 8       # Points that must carry detail before a video is indexed
+DURATION_TOLERANCE = 0.02     # Relative duration difference allowed between copies
+MIN_DURATION_TOLERANCE = 1.0  # Seconds, for short clips
+DEFAULT_TTL = 30 * 24 * 3600  # Seconds an indexed analysis stays valid
+DEFAULT_MAX_ROWS = 10000      # Indexed videos kept before the oldest are evicted
+
+@dataclass
+class VideoFingerprint:
+    """dHashes of a video sampled at fixed fractions of its duration."""
+    hashes: np.ndarray      # (points, 8) packed 64-bit dHashes
+    brightness: np.ndarray  # (points,) mean brightness of each hash thumbnail
+    duration: float
+    
+    @property
+    def distinct(self) -> bool:
+        """
+        Whether enough points carry detail to tell this video apart from others.
+        
+        Black or flat frames hash to (nearly) all-equal bits, which would match
+        any other flat video.
+        """
+        bits = np.unpackbits(self.hashes, axis=1).sum(axis=1)
+        return int(np.count_nonzero((bits > 2) & (bits < 62))) >= MIN_DISTINCT_POINTS
+
+def compute_video_fingerprint(
+    video_path: Union[str, Path],
+    probe: Optional[VideoProbe] = None,
+    points: int = FINGERPRINT_POINTS
+) -> Optional[VideoFingerprint]:
+    """
+    Fingerprint a video by hashing frames at the centres of equal slices of its duration.
+    
+    Only the sampled frames are decoded, so this is cheap next to frame extraction.
+    Offsets are relative to the duration, so copies re-encoded at another
+    resolution, bitrate or frame rate produce the same fingerprint; trimmed
+    copies do not.
+    
+    Args:
+        video_path: Path to video file
+        probe: Probe of the video, probed here if not given
+        points: Number of frames to hash
+    
+    Returns:
+        VideoFingerprint, or None if the video could not be read
+    """
+    if probe is None:
+        probe = probe_video(video_path)
+    if probe.duration <= 0 or probe.fps <= 0:
+        return None
+    
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        return None
+    frames = []
+    try:
+        last_frame = max(probe.frame_count - 1, 0)
+        for i in range(points):
+            frame_number = min(int((i + 0.5) / points * probe.duration * probe.fps), last_frame)
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+            ret, frame = cap.read()
+            if not ret:
+                logger.debug(f"Could not read frame {frame_number} for fingerprint")
+                return None
+            frames.append(frame)
+    finally:
+        cap.release()
+    
+    hashes, brightness = dhash_batch(frames)
+    return VideoFingerprint(hashes=hashes, brightness=brightness.astype(np.float32), duration=probe.duration)
+
+class FingerprintIndex:
+    """
+    SQLite index of video fingerprints and the frame analysis produced for them.
+    
+    Lookups narrow candidates by duration in SQL and compare their hashes in
+    one vectorized pass, returning the nearest video within MAX_MEAN_DISTANCE.
+    Entries expire after ttl seconds, and the oldest are evicted once more than
+    max_rows videos are indexed.
+    """
+    
+    def __init__(self, db_path: Union[str, Path], ttl: float = DEFAULT_TTL, max_rows: int = DEFAULT_MAX_ROWS):
+        """
+        Initialize fingerprint index.
+        
+        Args:
+            db_path: Path of the SQLite database, created if missing
+            ttl: Seconds an indexed analysis stays valid
+            max_rows: Number of indexed videos to keep
+        """
+        self.db_path = Path(db_path)
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS fingerprints ("
+                "id INTEGER PRIMARY KEY, "
+                "duration REAL NOT NULL, "
+                "points INTEGER NOT NULL, "
+                "hashes BLOB NOT NULL, "
+                "brightness BLOB NOT NULL, "
+                "analysis TEXT NOT NULL, "
+                "created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS fingerprints_duration ON fingerprints (duration)")
+            conn.execute("CREATE INDEX IF NOT EXISTS fingerprints_created_at ON fingerprints (created_at)")
+    
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per call, so the index can be used from worker threads
+        return sqlite3.connect(self.db_path, timeout=10)
+    
+    def add(self, fingerprint: VideoFingerprint, analysis: dict) -> bool:
+        """
+        Store the analysis of a fingerprinted video, then evict expired and excess entries.
+        
+        Returns:
+            True if stored, False if the fingerprint is too flat to be matched reliably
+            or the index could not be written
+        """
+        if not fingerprint.distinct:
+            logger.debug("Fingerprint has too little detail, not indexing")
+            return False
+        now = time.time()
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT INTO fingerprints (duration, points, hashes, brightness, analysis, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        fingerprint.duration,
+                        len(fingerprint.hashes),
+                        fingerprint.hashes.tobytes(),
+                        fingerprint.brightness.astype(np.float32).tobytes(),
+                        json.dumps(analysis, ensure_ascii=False),
+                        now
+                    )
+                )
+                self._evict(conn, now)
+        except sqlite3.Error as e:
+            logger.warning(f"Fingerprint index write failed: {str(e)}")
+            return False
+        return True
+    
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Delete expired entries, then the oldest ones until at most max_rows remain."""
+        conn.execute("DELETE FROM fingerprints WHERE created_at < ?", (now - self.ttl,))
+        excess = conn.execute("SELECT COUNT(*) FROM fingerprints").fetchone()[0] - self.max_rows
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM fingerprints WHERE id IN "
+                "(SELECT id FROM fingerprints ORDER BY created_at, id LIMIT ?)",
+                (excess,)
+            )
+            logger.debug(f"Evicted {excess} fingerprint index entries")
+    
+    def lookup(self, fingerprint: VideoFingerprint, max_distance: float = MAX_MEAN_DISTANCE) -> Optional[dict]:
+        """
+        Find the stored analysis of the nearest matching video.
+        
+        Args:
+            fingerprint: Fingerprint of the new video
+            max_distance: Largest mean Hamming distance per point accepted as a match
+        
+        Returns:
+            The stored analysis, or None if no indexed video matches within the TTL
+        """
+        if not fingerprint.distinct:
+            return None
+        tolerance = max(MIN_DURATION_TOLERANCE, fingerprint.duration * DURATION_TOLERANCE)
+        points = len(fingerprint.hashes)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, hashes, brightness FROM fingerprints "
+                "WHERE points = ? AND duration BETWEEN ? AND ? AND created_at >= ?",
+                (points, fingerprint.duration - tolerance, fingerprint.duration + tolerance, time.time() - self.ttl)
+            ).fetchall()
+        if not rows:
+            return None
+        
+        ids = [row[0] for row in rows]
+        hashes = np.stack([np.frombuffer(row[1], dtype=np.uint8).reshape(points, -1) for row in rows])
+        brightness = np.stack([np.frombuffer(row[2], dtype=np.float32) for row in rows])
+        
+        # Per-point distances; a point whose brightness moved too far counts as fully different
+        distances = np.unpackbits(hashes ^ fingerprint.hashes[None], axis=2).sum(axis=2).astype(np.float32)
+        distances[np.abs(brightness - fingerprint.brightness[None]) > DEDUP_BRIGHTNESS_TOLERANCE] = 64
+        mean_distances = distances.mean(axis=1)
+        
+        best = int(np.argmin(mean_distances))
+        if mean_distances[best] > max_distance:
+            logger.debug(f"No fingerprint match among {len(rows)} candidates "
+                         f"(nearest {mean_distances[best]:.1f})")
+            return None
+        
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT analysis FROM fingerprints WHERE id = ?", (ids[best],)).fetchone()
+        if row is None:
+            return None
+        logger.info(f"Fingerprint matched indexed video {ids[best]} (distance {mean_distances[best]:.1f})")
+        return json.loads(row[0])
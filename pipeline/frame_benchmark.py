@@ -0,0 +1,550 @@
+"""
+Frame extraction benchmarks
+Measures Step 2 decode and extraction performance on local or synthetic clips
+
+Usage:
+    python -m pipeline.frame_benchmark path/to/video.mp4 [--interval 3] [--repeat 3]
+    python -m pipeline.frame_benchmark path/to/video.mp4 --proxy-width 320
+    python -m pipeline.frame_benchmark path/to/video.mp4 [more clips...] --motion
+    python -m pipeline.frame_benchmark --synthetic [--sizes 320x180,1280x720] [--fps 24,30]
+"""
+
+import argparse
+import logging
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .Step_2_extract_frames import (
+    DEFAULT_PROXY_WIDTH,
+    MOTION_ENGINES,
+    SCORERS,
+    FrameExtractor,
+    execute_step,
+    iter_sample_positions,
+    make_proxy
+)
+from .memory_monitor import MemoryMonitor
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+DECODE_MODES = ("seek", "sequential")
+
+# Synthetic clip kinds, and extraction engines as execute_step arguments
+SYNTHETIC_KINDS = ("cuts", "fades", "pans", "static", "noise")
+EXTRACTION_ENGINES = {
+    "sequential": {"decode_mode": "sequential"},
+    "seek": {"decode_mode": "seek"},
+    "topk": {"selection": "topk"},
+    "parallel": {"workers": 2},
+    "ffmpeg": {"backend": "ffmpeg"},
+    "keyframes": {"backend": "keyframes"},
+    "lk": {"motion_engine": "lk"},
+    "phase": {"motion_engine": "phase"},
+    "bounded": {"memory_budget_mb": 64},
+    "calibrated": {"auto_calibrate": True}
+}
+
+# Seconds between a selected frame and a known event for the event to count as found
+EVENT_TOLERANCE = 0.5
+
+def _time_decode(video_path: Path, frame_interval: int, decode_mode: str) -> Dict:
+    """Decode every sampled frame of a clip without scoring and time it."""
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video: {video_path}")
+    
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    decoded = 0
+    
+    start = time.perf_counter()
+    for _ in iter_sample_positions(cap, frame_count, frame_interval, decode_mode):
+        ret, _frame = cap.retrieve()
+        if not ret:
+            break
+        decoded += 1
+    elapsed = time.perf_counter() - start
+    cap.release()
+    
+    return {
+        "decoded_frames": decoded,
+        "seconds": elapsed,
+        "frames_per_second": decoded / elapsed if elapsed > 0 else 0.0
+    }
+
+def _time_extraction(video_path: Path, frame_interval: int, decode_mode: str, max_frames: int) -> Dict:
+    """Run the full extract_frames path in a scratch directory and time it."""
+    with tempfile.TemporaryDirectory() as scratch:
+        extractor = FrameExtractor(video_path, Path(scratch))
+        start = time.perf_counter()
+        frames = extractor.extract_frames(
+            max_frames=max_frames,
+            frame_interval=frame_interval,
+            decode_mode=decode_mode
+        )
+        elapsed = time.perf_counter() - start
+        return {
+            "saved_frames": [frame.name for frame in frames],
+            "seconds": elapsed
+        }
+
+def benchmark_decode_modes(
+    video_path: Path,
+    frame_interval: int = 3,
+    max_frames: int = 12,
+    repeat: int = 3
+) -> Dict[str, Dict]:
+    """
+    Compare the seek and sequential decode paths on the same clip.
+    
+    Args:
+        video_path: Path to video file
+        frame_interval: Sample every Nth frame
+        max_frames: Maximum number of frames passed to extract_frames
+        repeat: Number of runs per mode; the fastest run is reported
+    
+    Returns:
+        Dictionary keyed by decode mode with decode-only and full extraction timings
+    """
+    results = {}
+    for mode in DECODE_MODES:
+        decode_runs = [_time_decode(video_path, frame_interval, mode) for _ in range(repeat)]
+        extract_runs = [_time_extraction(video_path, frame_interval, mode, max_frames) for _ in range(repeat)]
+        results[mode] = {
+            "decode": min(decode_runs, key=lambda r: r["seconds"]),
+            "extract": min(extract_runs, key=lambda r: r["seconds"])
+        }
+    return results
+
+def _print_report(results: Dict[str, Dict]):
+    """Print a short comparison table."""
+    print(f"{'mode':<12}{'decoded':>10}{'decode s':>12}{'fps':>10}{'extract s':>12}{'saved':>8}")
+    for mode, result in results.items():
+        decode = result["decode"]
+        extract = result["extract"]
+        print(f"{mode:<12}{decode['decoded_frames']:>10}{decode['seconds']:>12.3f}"
+              f"{decode['frames_per_second']:>10.1f}{extract['seconds']:>12.3f}{len(extract['saved_frames']):>8}")
+    
+    if "seek" in results and "sequential" in results:
+        seek_time = results["seek"]["decode"]["seconds"]
+        sequential_time = results["sequential"]["decode"]["seconds"]
+        if sequential_time > 0:
+            print(f"\nSequential decode speedup: {seek_time / sequential_time:.2f}x")
+        if results["seek"]["extract"]["saved_frames"] != results["sequential"]["extract"]["saved_frames"]:
+            print("Warning: decode modes selected different frames")
+
+def _agreement(full: np.ndarray, proxy: np.ndarray, threshold: float) -> Dict:
+    """Summarize how closely proxy scores track full-resolution scores."""
+    if len(full) < 2:
+        return {"pairs": len(full)}
+    correlation = float(np.corrcoef(full, proxy)[0, 1]) if np.std(full) > 0 and np.std(proxy) > 0 else float("nan")
+    return {
+        "pairs": len(full),
+        "correlation": correlation,
+        "mean_abs_error": float(np.mean(np.abs(full - proxy))),
+        "decision_agreement": float(np.mean((full > threshold) == (proxy > threshold)))
+    }
+
+def compare_proxy_scores(
+    video_path: Path,
+    proxy_width: int = DEFAULT_PROXY_WIDTH,
+    frame_interval: int = 3,
+    min_scene_change: float = 30.0,
+    min_motion_threshold: float = 2.0
+) -> Dict:
+    """
+    Compare frame difference and motion scores on proxies with full-resolution scores.
+    
+    Every consecutive pair of sampled frames is scored twice: on full-resolution
+    grayscale frames and on proxies downscaled to proxy_width. Motion on proxies is
+    reported in source pixels, so both use the same thresholds.
+    
+    Returns:
+        Dictionary with agreement statistics and timings for both scorers
+    """
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video: {video_path}")
+    
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    scores = {"full_diff": [], "proxy_diff": [], "full_motion": [], "proxy_motion": []}
+    timings = {"full": 0.0, "proxy": 0.0}
+    prev_full = prev_proxy = None
+    
+    with tempfile.TemporaryDirectory() as scratch:
+        extractor = FrameExtractor(video_path, Path(scratch))
+        for _ in iter_sample_positions(cap, frame_count, frame_interval, "sequential"):
+            ret, frame = cap.retrieve()
+            if not ret:
+                break
+            full = make_proxy(frame, None)
+            proxy = make_proxy(frame, proxy_width)
+            scale = full.shape[1] / proxy.shape[1]
+            
+            if prev_full is not None:
+                start = time.perf_counter()
+                scores["full_diff"].append(extractor._compute_frame_difference(full, prev_full))
+                scores["full_motion"].append(extractor._detect_motion(full, prev_full))
+                timings["full"] += time.perf_counter() - start
+                
+                start = time.perf_counter()
+                scores["proxy_diff"].append(extractor._compute_frame_difference(proxy, prev_proxy))
+                scores["proxy_motion"].append(extractor._detect_motion(proxy, prev_proxy, scale))
+                timings["proxy"] += time.perf_counter() - start
+            prev_full, prev_proxy = full, proxy
+    cap.release()
+    
+    scores = {key: np.asarray(values, dtype=np.float64) for key, values in scores.items()}
+    return {
+        "proxy_width": proxy_width,
+        "scene_change": _agreement(scores["full_diff"], scores["proxy_diff"], min_scene_change),
+        "motion": _agreement(scores["full_motion"], scores["proxy_motion"], min_motion_threshold),
+        "full_seconds": timings["full"],
+        "proxy_seconds": timings["proxy"]
+    }
+
+def _print_proxy_report(result: Dict):
+    """Print proxy versus full-resolution score agreement."""
+    print(f"Proxy width: {result['proxy_width']}px")
+    for name in ("scene_change", "motion"):
+        stats = result[name]
+        if "correlation" not in stats:
+            print(f"{name}: not enough frames")
+            continue
+        print(f"{name:<14} pairs={stats['pairs']} r={stats['correlation']:.3f} "
+              f"mae={stats['mean_abs_error']:.3f} agreement={stats['decision_agreement'] * 100:.1f}%")
+    if result["proxy_seconds"] > 0:
+        print(f"Scoring time: full={result['full_seconds']:.3f}s proxy={result['proxy_seconds']:.3f}s "
+              f"({result['full_seconds'] / result['proxy_seconds']:.1f}x faster)")
+
+def benchmark_motion_engines(
+    video_paths: List[Path],
+    frame_interval: int = 3,
+    proxy_width: int = DEFAULT_PROXY_WIDTH,
+    min_motion_threshold: float = 2.0
+) -> Dict[str, Dict]:
+    """
+    Compare runtime and Farneback agreement of every motion engine on sample clips.
+    
+    All engines score the same consecutive proxy pairs. Agreement is measured
+    against the Farneback scores, pooled over all clips.
+    
+    Returns:
+        Dictionary keyed by engine with timing and agreement statistics
+    """
+    scores = {engine: [] for engine in MOTION_ENGINES}
+    timings = {engine: 0.0 for engine in MOTION_ENGINES}
+    
+    with tempfile.TemporaryDirectory() as scratch:
+        extractors = {engine: FrameExtractor(video_paths[0], Path(scratch), motion_engine=engine)
+                      for engine in MOTION_ENGINES}
+        for video_path in video_paths:
+            cap = cv2.VideoCapture(str(video_path))
+            if not cap.isOpened():
+                raise ValueError(f"Could not open video: {video_path}")
+            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            prev_proxy = None
+            
+            for _ in iter_sample_positions(cap, frame_count, frame_interval, "sequential"):
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
+                proxy = make_proxy(frame, proxy_width)
+                scale = frame.shape[1] / proxy.shape[1]
+                if prev_proxy is not None:
+                    for engine, extractor in extractors.items():
+                        start = time.perf_counter()
+                        scores[engine].append(extractor._detect_motion(proxy, prev_proxy, scale))
+                        timings[engine] += time.perf_counter() - start
+                prev_proxy = proxy
+            cap.release()
+    
+    reference = np.asarray(scores["farneback"], dtype=np.float64)
+    results = {}
+    for engine in MOTION_ENGINES:
+        values = np.asarray(scores[engine], dtype=np.float64)
+        results[engine] = {
+            "seconds": timings[engine],
+            "ms_per_pair": timings[engine] * 1000.0 / len(values) if len(values) else 0.0,
+            "agreement": _agreement(reference, values, min_motion_threshold)
+        }
+    return results
+
+def _print_motion_report(results: Dict[str, Dict]):
+    """Print motion engine runtime and agreement with Farneback."""
+    print(f"{'engine':<12}{'ms/pair':>10}{'speedup':>10}{'r':>8}{'mae':>8}{'agree':>8}")
+    reference_time = results["farneback"]["seconds"]
+    for engine, result in results.items():
+        stats = result["agreement"]
+        speedup = reference_time / result["seconds"] if result["seconds"] > 0 else 0.0
+        if "correlation" not in stats:
+            print(f"{engine:<12}{result['ms_per_pair']:>10.2f}{speedup:>10.1f}   not enough frames")
+            continue
+        print(f"{engine:<12}{result['ms_per_pair']:>10.2f}{speedup:>10.1f}{stats['correlation']:>8.3f}"
+              f"{stats['mean_abs_error']:>8.2f}{stats['decision_agreement'] * 100:>7.1f}%")
+
+def _textured_scene(rng: np.random.Generator, width: int, height: int) -> np.ndarray:
+    """A smooth random texture with a distinct colour cast, standing in for one shot."""
+    small = rng.integers(0, 256, (max(2, height // 16), max(2, width // 16), 3), dtype=np.uint8)
+    scene = cv2.resize(small, (width, height), interpolation=cv2.INTER_CUBIC)
+    tint = rng.integers(-60, 61, 3)
+    return np.clip(scene.astype(np.int16) + tint, 0, 255).astype(np.uint8)
+
+def make_synthetic_clip(
+    path: Path,
+    kind: str,
+    size: Tuple[int, int] = (640, 360),
+    fps: int = 30,
+    duration: float = 8.0,
+    seed: int = 0
+) -> List[Tuple[float, float]]:
+    """
+    Write a deterministic synthetic clip with cv2.VideoWriter.
+    
+    Kinds:
+        cuts: hard cuts between textured shots every 2 seconds
+        fades: 0.5 second cross-fades between shots every 2 seconds
+        pans: a camera pan across a wide texture, with one hard cut halfway
+        static: a still talking-head style frame where only a small mouth region moves
+        noise: a still frame under heavy per-frame sensor noise
+    
+    Args:
+        path: Output path (.avi, written with MJPG)
+        kind: One of SYNTHETIC_KINDS
+        size: (width, height) of the clip
+        fps: Frame rate
+        duration: Length in seconds
+        seed: Random seed; the same arguments always produce the same clip
+    
+    Returns:
+        Known events as (start, end) time windows in seconds, e.g. a cut or a fade
+    """
+    if kind not in SYNTHETIC_KINDS:
+        raise ValueError(f"Unknown synthetic clip kind: {kind}")
+    width, height = size
+    rng = np.random.default_rng(seed)
+    frame_total = int(round(duration * fps))
+    shot_length = 2.0
+    scenes = [_textured_scene(rng, width, height) for _ in range(int(np.ceil(duration / shot_length)) + 1)]
+    canvas = _textured_scene(rng, width * 3, height)
+    noise_rng = np.random.default_rng(seed + 1)
+    
+    events = []
+    if kind == "cuts":
+        events = [(t, t) for t in np.arange(shot_length, duration, shot_length)]
+    elif kind == "fades":
+        events = [(t - 0.25, t + 0.25) for t in np.arange(shot_length, duration, shot_length)]
+    elif kind == "pans":
+        events = [(duration / 2, duration / 2)]
+    
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    if not writer.isOpened():
+        raise ValueError(f"Could not open video writer: {path}")
+    try:
+        for index in range(frame_total):
+            t = index / fps
+            shot = int(t // shot_length)
+            if kind == "cuts":
+                frame = scenes[shot].copy()
+                # A small moving square keeps each shot from being perfectly still
+                x = int((t % shot_length) / shot_length * (width - height // 6))
+                cv2.rectangle(frame, (x, height // 3), (x + height // 6, height // 2), (255, 255, 255), -1)
+            elif kind == "fades":
+                offset = t - (shot + 1) * shot_length
+                if offset > -0.25:
+                    alpha = (offset + 0.25) / 0.5
+                    frame = cv2.addWeighted(scenes[shot], 1.0 - alpha, scenes[shot + 1], alpha, 0)
+                elif t - shot * shot_length < 0.25 and shot > 0:
+                    alpha = (t - shot * shot_length + 0.25) / 0.5
+                    frame = cv2.addWeighted(scenes[shot - 1], 1.0 - alpha, scenes[shot], alpha, 0)
+                else:
+                    frame = scenes[shot].copy()
+            elif kind == "pans":
+                x = int(t / duration * (canvas.shape[1] - width))
+                frame = np.ascontiguousarray(canvas[:, x:x + width])
+                if t >= duration / 2:
+                    frame = 255 - frame
+            elif kind == "static":
+                frame = scenes[0].copy()
+                center = (width // 2, height // 2)
+                cv2.ellipse(frame, center, (height // 5, height // 4), 0, 0, 360, (150, 170, 200), -1)
+                mouth = max(1, int(height // 40 * (1 + np.sin(t * 12))))
+                cv2.ellipse(frame, (center[0], center[1] + height // 8), (height // 16, mouth), 0, 0, 360,
+                            (40, 40, 120), -1)
+            else:
+                noise = noise_rng.normal(0, 25, scenes[0].shape)
+                frame = np.clip(scenes[0] + noise, 0, 255).astype(np.uint8)
+            writer.write(frame)
+    finally:
+        writer.release()
+    return events
+
+def _peak_rss_mb(monitor: Optional[MemoryMonitor] = None) -> Optional[float]:
+    """
+    Peak resident set size of this process and its children in megabytes.
+    
+    The monitor samples this process together with its live children, such as
+    parallel segment workers. getrusage adds the exact peak of this process,
+    which catches spikes between samples. RUSAGE_CHILDREN is not used: a forked
+    child that runs ffprobe reports the RSS it inherited from this process.
+    """
+    peaks = []
+    if monitor is not None and monitor.peak_mb is not None:
+        peaks.append(monitor.peak_mb)
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        peaks.append(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024)
+    return max(peaks) if peaks else None
+
+def _run_extraction_job(video_path: Path, kwargs: Dict) -> Dict:
+    """Run execute_step once in a scratch directory; meant to run in a fresh process."""
+    with tempfile.TemporaryDirectory() as scratch, MemoryMonitor() as monitor:
+        start = time.perf_counter()
+        key_frames, _, _, _, _, shot_index = execute_step(
+            video_path, Path(scratch), reuse_shot_index=False, **kwargs
+        )
+        elapsed = time.perf_counter() - start
+    return {
+        "seconds": elapsed,
+        "peak_rss_mb": _peak_rss_mb(monitor),
+        "selected_times": shot_index.key_times.tolist()
+    }
+
+def _event_scores(selected: List[float], events: List[Tuple[float, float]]) -> Dict:
+    """Recall of known events and precision of selected frames, within EVENT_TOLERANCE."""
+    def near(time: float, event: Tuple[float, float]) -> bool:
+        return event[0] - EVENT_TOLERANCE <= time <= event[1] + EVENT_TOLERANCE
+    
+    found = sum(1 for event in events if any(near(time, event) for time in selected))
+    correct = sum(1 for time in selected if any(near(time, event) for event in events))
+    return {
+        "recall": found / len(events) if events else None,
+        "precision": correct / len(selected) if selected else None
+    }
+
+def available_engines() -> List[str]:
+    """Extraction engines whose external tools are installed."""
+    engines = []
+    for name, kwargs in EXTRACTION_ENGINES.items():
+        backend = kwargs.get("backend")
+        if backend == "ffmpeg" and shutil.which("ffmpeg") is None:
+            continue
+        if backend == "keyframes" and (shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None):
+            continue
+        engines.append(name)
+    return engines
+
+def run_synthetic_suite(
+    sizes: Optional[List[Tuple[int, int]]] = None,
+    fps_values: Optional[List[int]] = None,
+    kinds: Optional[List[str]] = None,
+    engines: Optional[List[str]] = None,
+    scorers: Optional[List[str]] = None,
+    duration: float = 8.0,
+    max_frames: int = 12
+) -> List[Dict]:
+    """
+    Run every extraction engine and scorer over a grid of synthetic clips.
+    
+    Each run happens in a fresh worker process so its peak RSS is its own.
+    Runs only on the CPU and needs no network access; the ffmpeg and keyframes
+    engines are skipped when ffmpeg/ffprobe are not installed.
+    
+    Returns:
+        One result row per clip, engine and scorer
+    """
+    sizes = sizes or [(320, 180), (1280, 720)]
+    fps_values = fps_values or [24, 30]
+    kinds = kinds or list(SYNTHETIC_KINDS)
+    engines = engines or available_engines()
+    scorers = scorers or list(SCORERS)
+    rows = []
+    with tempfile.TemporaryDirectory() as clips_dir:
+        for kind in kinds:
+            for size in sizes:
+                for fps in fps_values:
+                    clip = Path(clips_dir) / f"{kind}_{size[0]}x{size[1]}_{fps}.avi"
+                    events = make_synthetic_clip(clip, kind, size, fps, duration)
+                    frame_total = int(round(duration * fps))
+                    for engine in engines:
+                        for scorer in scorers:
+                            kwargs = dict(EXTRACTION_ENGINES[engine], scorer=scorer, max_frames=max_frames)
+                            with ProcessPoolExecutor(max_workers=1) as pool:
+                                result = pool.submit(_run_extraction_job, clip, kwargs).result()
+                            rows.append({
+                                "clip": clip.stem,
+                                "engine": engine,
+                                "scorer": scorer,
+                                "frames_per_second": frame_total / result["seconds"] if result["seconds"] > 0 else 0.0,
+                                "seconds": result["seconds"],
+                                "peak_rss_mb": result["peak_rss_mb"],
+                                "selected": len(result["selected_times"]),
+                                **_event_scores(result["selected_times"], events)
+                            })
+    return rows
+
+def _print_suite_report(rows: List[Dict]):
+    """Print one line per synthetic run."""
+    def fmt(value: Optional[float], spec: str) -> str:
+        return "-" if value is None else format(value, spec)
+    
+    print(f"{'clip':<22}{'engine':<12}{'scorer':<11}{'fps':>9}{'wall s':>9}{'rss MB':>9}"
+          f"{'sel':>5}{'recall':>8}{'prec':>7}")
+    for row in rows:
+        print(f"{row['clip']:<22}{row['engine']:<12}{row['scorer']:<11}{row['frames_per_second']:>9.1f}"
+              f"{row['seconds']:>9.2f}{fmt(row['peak_rss_mb'], '.0f'):>9}{row['selected']:>5}"
+              f"{fmt(row['recall'], '.2f'):>8}{fmt(row['precision'], '.2f'):>7}")
+
+def _parse_sizes(value: str) -> List[Tuple[int, int]]:
+    """Parse a list of sizes such as 320x180,1280x720."""
+    return [tuple(int(part) for part in size.split("x")) for size in value.split(",")]
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Benchmark Step 2 frame extraction")
+    parser.add_argument("video", type=Path, nargs="*", help="Video file(s) to benchmark")
+    parser.add_argument("--interval", type=int, default=3, help="Frame sampling interval")
+    parser.add_argument("--max-frames", type=int, default=12, help="Maximum frames to extract")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode")
+    parser.add_argument("--proxy-width", type=int, help="Compare proxy scores at this width with full resolution")
+    parser.add_argument("--motion", action="store_true", help="Compare motion engines against Farneback")
+    parser.add_argument("--synthetic", action="store_true",
+                        help="Run every engine and scorer on generated clips with known cuts")
+    parser.add_argument("--sizes", type=_parse_sizes, default=[(320, 180), (1280, 720)],
+                        help="Synthetic clip sizes, e.g. 320x180,1280x720")
+    parser.add_argument("--fps", type=lambda value: [int(fps) for fps in value.split(",")], default=[24, 30],
+                        help="Synthetic clip frame rates, e.g. 24,30")
+    parser.add_argument("--kinds", type=lambda value: value.split(","), default=list(SYNTHETIC_KINDS),
+                        help="Synthetic clip kinds, e.g. cuts,fades")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.WARNING)
+    if args.synthetic:
+        _print_suite_report(run_synthetic_suite(args.sizes, args.fps, args.kinds, max_frames=args.max_frames))
+        return
+    if not args.video:
+        parser.error("give at least one video, or --synthetic")
+    if args.motion:
+        _print_motion_report(benchmark_motion_engines(args.video, args.interval))
+        return
+    for video in args.video:
+        print(f"== {video}")
+        if args.proxy_width:
+            _print_proxy_report(compare_proxy_scores(video, args.proxy_width, args.interval))
+        else:
+            _print_report(benchmark_decode_modes(video, args.interval, args.max_frames, args.repeat))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Frame encoding module
+Grayscale proxies, perceptual hashes and output encodings of video frames, shared by the pipeline steps
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Width of the grayscale proxy frames used for scoring
+DEFAULT_PROXY_WIDTH = 320
+
+# Maximum difference in mean brightness between frames whose dHashes match
+# (dHash ignores brightness, so flat frames all look alike)
+DEDUP_BRIGHTNESS_TOLERANCE = 24.0
+
+def make_proxy(frame: np.ndarray, width: Optional[int] = DEFAULT_PROXY_WIDTH,
+               gray_buffer: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Convert a frame to grayscale once and downscale it to the given width.
+    
+    gray_buffer is an optional full-resolution scratch array for the grayscale
+    conversion. It is only written when the proxy is downscaled, so the returned
+    proxy never aliases it.
+    """
+    downscale = width is not None and frame.shape[1] > width
+    if frame.ndim == 2:
+        gray = frame
+    elif downscale and gray_buffer is not None and gray_buffer.shape == frame.shape[:2]:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray_buffer)
+    else:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    if not downscale:
+        return gray
+    height = max(1, int(round(gray.shape[0] * width / gray.shape[1])))
+    return cv2.resize(gray, (width, height), interpolation=cv2.INTER_AREA)
+
+def dhash_batch(frames: List[np.ndarray], hash_size: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute difference hashes (dHash) of a batch of frames.
+    
+    Each frame is reduced to a (hash_size, hash_size + 1) grayscale thumbnail and
+    every bit records whether a pixel is brighter than its right neighbour.
+    
+    Returns:
+        Tuple of the packed hash bits, shape (len(frames), hash_size * hash_size / 8),
+        and the mean brightness of each thumbnail
+    """
+    thumbs = np.stack([
+        cv2.resize(make_proxy(frame, None), (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+        for frame in frames
+    ]).astype(np.int16)
+    bits = thumbs[:, :, 1:] > thumbs[:, :, :-1]
+    return np.packbits(bits.reshape(len(frames), -1), axis=1), thumbs.mean(axis=(1, 2))
+
+def hamming_distances(hashes: np.ndarray) -> np.ndarray:
+    """Pairwise Hamming distances between packed hashes, as an (N, N) matrix."""
+    return np.unpackbits(hashes[:, None, :] ^ hashes[None, :, :], axis=2).sum(axis=2)
+
+@dataclass
+class FrameOutputProfile:
+    """Size and encoding of the saved key frames."""
+    max_long_edge: Optional[int] = None  # None keeps the source resolution
+    quality: int = 95
+    format: str = "jpeg"  # "jpeg" or "webp"
+    
+    @property
+    def extension(self) -> str:
+        return ".webp" if self.format == "webp" else ".jpg"
+    
+    def encode(self, frame: np.ndarray) -> Optional[bytes]:
+        """Downscale a BGR frame to max_long_edge and encode it, returning None on failure."""
+        height, width = frame.shape[:2]
+        if self.max_long_edge and max(height, width) > self.max_long_edge:
+            scale = self.max_long_edge / max(height, width)
+            size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+            frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        if self.format == "webp":
+            params = [cv2.IMWRITE_WEBP_QUALITY, self.quality]
+        else:
+            params = [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        ok, encoded = cv2.imencode(self.extension, frame, params)
+        return encoded.tobytes() if ok else None
+
+# "vision" fits what the vision APIs use: GPT-4o tiles images at most 768px on the short side
+# and Google Vision label/object detection needs far less
+OUTPUT_PROFILES = {
+    "full": FrameOutputProfile(),
+    "vision": FrameOutputProfile(max_long_edge=1024, quality=85),
+    "webp": FrameOutputProfile(max_long_edge=1024, quality=80, format="webp")
+}
+
+def get_output_profile(name: str) -> FrameOutputProfile:
+    """Get a frame output profile by name."""
+    if name not in OUTPUT_PROFILES:
+        raise ValueError(f"Unknown frame output profile: {name}")
+    return OUTPUT_PROFILES[name]
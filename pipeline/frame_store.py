@@ -0,0 +1,135 @@
+"""
+Frame store module
+Hands encoded key frames from frame extraction to frame analysis in memory
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024  # 64MB of encoded frames
+
+@dataclass
+class StoredFrame:
+    """An encoded key frame with its selection scores."""
+    path: Path
+    timestamp: float
+    scene_score: float = 0.0
+    motion_score: float = 0.0
+    data: Optional[bytes] = None  # None once spilled to path
+    
+    @property
+    def in_memory(self) -> bool:
+        return self.data is not None
+
+class FrameStore:
+    """
+    Keeps encoded frames in memory, spilling the oldest to disk over a memory budget.
+    
+    Frames are keyed by file name, so a frame can be looked up by any path that
+    points at the frames directory it would be written to.
+    """
+    
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET):
+        """
+        Initialize frame store.
+        
+        Args:
+            memory_budget: Maximum bytes of encoded frames kept in memory
+        """
+        self.memory_budget = memory_budget
+        self.memory_bytes = 0
+        self.spilled = 0
+        self._frames: "OrderedDict[str, StoredFrame]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def put(self, path: Union[Path, str], data: bytes, timestamp: float,
+            scene_score: float = 0.0, motion_score: float = 0.0):
+        """Add an encoded frame, spilling older frames if the memory budget is exceeded."""
+        path = Path(path)
+        with self._lock:
+            previous = self._frames.pop(path.name, None)
+            if previous is not None and previous.in_memory:
+                self.memory_bytes -= len(previous.data)
+            self._frames[path.name] = StoredFrame(path, timestamp, scene_score, motion_score, data)
+            self.memory_bytes += len(data)
+            self._enforce_budget()
+    
+    def _enforce_budget(self):
+        """Spill frames to disk, oldest first, until memory use fits the budget."""
+        for frame in self._frames.values():
+            if self.memory_bytes <= self.memory_budget:
+                break
+            if frame.in_memory:
+                self._spill(frame)
+    
+    def _spill(self, frame: StoredFrame):
+        """Write a frame to its path and release its bytes."""
+        frame.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(frame.path, "wb") as f:
+            f.write(frame.data)
+        self.memory_bytes -= len(frame.data)
+        self.spilled += 1
+        frame.data = None
+        logger.debug(f"Spilled {frame.path.name} to disk")
+    
+    def get(self, path: Union[Path, str]) -> Optional[StoredFrame]:
+        """Get the stored frame for a path, or None if it is not in the store."""
+        with self._lock:
+            return self._frames.get(Path(path).name)
+    
+    def read_bytes(self, path: Union[Path, str]) -> bytes:
+        """
+        Read the encoded bytes of a frame.
+        
+        Frames held in memory are returned without file I/O; spilled frames and
+        frames that were never added to the store are read from disk.
+        """
+        frame = self.get(path)
+        if frame is not None:
+            data = frame.data
+            if data is not None:
+                return data
+            path = frame.path
+        with open(path, "rb") as f:
+            return f.read()
+    
+    def discard(self, path: Union[Path, str]):
+        """Remove a frame from the store; a spilled copy on disk is left to the caller."""
+        with self._lock:
+            frame = self._frames.pop(Path(path).name, None)
+            if frame is not None and frame.in_memory:
+                self.memory_bytes -= len(frame.data)
+    
+    def persist(self):
+        """Write every frame still held in memory to disk."""
+        with self._lock:
+            for frame in self._frames.values():
+                if frame.in_memory:
+                    self._spill(frame)
+    
+    def paths(self) -> List[Path]:
+        """Paths of the stored frames, in insertion order."""
+        with self._lock:
+            return [frame.path for frame in self._frames.values()]
+    
+    def stats(self) -> Dict[str, int]:
+        """Frame counts and memory use, for logging."""
+        with self._lock:
+            return {
+                "frames": len(self._frames),
+                "in_memory": sum(1 for frame in self._frames.values() if frame.in_memory),
+                "spilled": self.spilled,
+                "memory_bytes": self.memory_bytes
+            }
+    
+    def __contains__(self, path: Union[Path, str]) -> bool:
+        return self.get(path) is not None
+    
+    def __len__(self) -> int:
+        return len(self._frames)
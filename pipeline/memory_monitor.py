@@ -0,0 +1,119 @@
+"""
+Memory monitor module
+Tracks the resident memory of a pipeline job against an optional budget
+"""
+
+import logging
+import os
+import threading
+from typing import Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+def current_rss_mb(include_children: bool = True) -> Optional[float]:
+    """
+    Resident set size of this process in megabytes.
+    
+    Args:
+        include_children: Add the RSS of child processes, such as segment workers
+    
+    Returns:
+        RSS in megabytes, or None when psutil is not installed
+    """
+    if psutil is None:
+        return None
+    process = psutil.Process(os.getpid())
+    rss = process.memory_info().rss
+    if include_children:
+        for child in process.children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+            except psutil.Error:
+                pass
+    return rss / (1024 * 1024)
+
+class MemoryMonitor:
+    """
+    Samples resident memory in a background thread and records the peak.
+    
+    Jobs share the bot process, so the budget applies to the growth of resident
+    memory since the monitor started rather than to the process total.
+    
+    Usage:
+        with MemoryMonitor(budget_mb=512) as monitor:
+            ...
+        logger.info(f"Peak memory: {monitor.peak_mb:.0f} MB (+{monitor.peak_growth_mb:.0f} MB)")
+    """
+    
+    def __init__(self, budget_mb: Optional[float] = None, interval: float = 0.05):
+        """
+        Initialize memory monitor.
+        
+        Args:
+            budget_mb: Allowed growth of resident memory in megabytes, None only records the peak
+            interval: Seconds between samples
+        """
+        self.budget_mb = budget_mb
+        self.interval = interval
+        self.start_mb = None
+        self.peak_mb = None
+        self.current_mb = None
+        self._stop = threading.Event()
+        self._thread = None
+    
+    @property
+    def available(self) -> bool:
+        return psutil is not None
+    
+    @property
+    def peak_growth_mb(self) -> Optional[float]:
+        """Peak resident memory above the level at start."""
+        if self.peak_mb is None or self.start_mb is None:
+            return None
+        return max(0.0, self.peak_mb - self.start_mb)
+    
+    @property
+    def over_budget(self) -> bool:
+        """Whether the last sample exceeded the budget."""
+        if self.budget_mb is None or self.current_mb is None or self.start_mb is None:
+            return False
+        return self.current_mb - self.start_mb > self.budget_mb
+    
+    def sample(self) -> Optional[float]:
+        """Take one sample now and update the peak."""
+        rss = current_rss_mb()
+        if rss is not None:
+            self.current_mb = rss
+            self.peak_mb = rss if self.peak_mb is None else max(self.peak_mb, rss)
+        return rss
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+    
+    def start(self) -> "MemoryMonitor":
+        if not self.available:
+            logger.debug("psutil is not installed, memory is not monitored")
+            return self
+        self.start_mb = self.sample()
+        self._thread = threading.Thread(target=self._run, name="memory_monitor", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.sample()
+    
+    def __enter__(self) -> "MemoryMonitor":
+        return self.start()
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -0,0 +1,189 @@
+"""
+Shot index module
+Compact, array-backed index of the shots and key frames found by frame extraction
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SHOT_INDEX_SUFFIX = ".shots.npz"
+
+@dataclass
+class ShotIndex:
+    """
+    Shot segments and selected key frames of a video.
+    
+    Segment arrays are parallel: segment i spans starts[i] to ends[i] seconds,
+    has peak motion peak_motion[i] and is represented by the frame at
+    representative_times[i] (representative_frames[i] names the saved key frame,
+    or is empty when no key frame falls in the segment). Key frame arrays are
+    parallel as well: key_frames[i] names the key frame saved at key_times[i],
+    and the scores hold what is needed to write the key frames again without
+    scoring the video.
+    """
+    starts: np.ndarray
+    ends: np.ndarray
+    peak_motion: np.ndarray
+    representative_times: np.ndarray
+    representative_frames: np.ndarray
+    key_times: np.ndarray
+    key_frames: np.ndarray
+    key_scene_scores: np.ndarray
+    key_motion_scores: np.ndarray
+    key_scene_changes: np.ndarray
+    params: str = "{}"
+    
+    def __len__(self) -> int:
+        return len(self.starts)
+    
+    def segments(self) -> List[Dict]:
+        """Segments as a list of dictionaries, for JSON output and later steps."""
+        return [
+            {
+                "start": round(float(start), 3),
+                "end": round(float(end), 3),
+                "peak_motion": round(float(motion), 3),
+                "representative_time": round(float(time), 3),
+                "representative_frame": str(frame) or None
+            }
+            for start, end, motion, time, frame in zip(
+                self.starts, self.ends, self.peak_motion, self.representative_times, self.representative_frames
+            )
+        ]
+    
+    def save(self, path: Path, video_path: Path):
+        """Save the index as an NPZ file, tagged with the identity of the video it describes."""
+        stat = os.stat(video_path)
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                starts=self.starts,
+                ends=self.ends,
+                peak_motion=self.peak_motion,
+                representative_times=self.representative_times,
+                representative_frames=self.representative_frames,
+                key_times=self.key_times,
+                key_frames=self.key_frames,
+                key_scene_scores=self.key_scene_scores,
+                key_motion_scores=self.key_motion_scores,
+                key_scene_changes=self.key_scene_changes,
+                params=np.array(self.params),
+                video_identity=np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+            )
+        logger.debug(f"Saved shot index with {len(self)} segments to {path}")
+
+def shot_index_path(video_path: Path) -> Path:
+    """Path of the shot index sidecar next to a video."""
+    video_path = Path(video_path)
+    return video_path.with_name(video_path.name + SHOT_INDEX_SUFFIX)
+
+def params_signature(**params) -> str:
+    """Canonical string of the extraction parameters an index was built with."""
+    return json.dumps(params, sort_keys=True)
+
+def load_shot_index(video_path: Path, params: Optional[str] = None) -> Optional[ShotIndex]:
+    """
+    Load the shot index sidecar of a video.
+    
+    Args:
+        video_path: Path to video file
+        params: Required parameter signature; an index built with other parameters is ignored
+    
+    Returns:
+        ShotIndex, or None if there is no index for the current file and parameters
+    """
+    path = shot_index_path(video_path)
+    if not path.exists():
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            stat = os.stat(video_path)
+            if data["video_identity"].tolist() != [stat.st_size, stat.st_mtime_ns]:
+                logger.debug(f"Ignoring stale shot index {path}")
+                return None
+            if "key_frames" not in data.files:
+                logger.debug(f"Ignoring shot index {path} without key frame names")
+                return None
+            index = ShotIndex(
+                starts=data["starts"],
+                ends=data["ends"],
+                peak_motion=data["peak_motion"],
+                representative_times=data["representative_times"],
+                representative_frames=data["representative_frames"],
+                key_times=data["key_times"],
+                key_frames=data["key_frames"],
+                key_scene_scores=data["key_scene_scores"],
+                key_motion_scores=data["key_motion_scores"],
+                key_scene_changes=data["key_scene_changes"],
+                params=str(data["params"])
+            )
+    except (OSError, KeyError, ValueError) as e:
+        logger.warning(f"Could not load shot index {path}: {str(e)}")
+        return None
+    if params is not None and index.params != params:
+        logger.debug(f"Ignoring shot index {path} built with other parameters")
+        return None
+    return index
+
+def build_shot_index(
+    samples: Sequence[Tuple[int, float, float, float]],
+    key_frames: Sequence[Tuple[Path, float, float, float, bool]],
+    min_scene_change: float,
+    params: str = "{}"
+) -> ShotIndex:
+    """
+    Build a shot index from scored samples and the final key frames.
+    
+    Args:
+        samples: Scored samples as (frame number, timestamp, frame difference, motion score)
+        key_frames: Saved key frames as (path, timestamp, frame difference, motion score, is scene change)
+        min_scene_change: Frame difference above which a sample starts a new shot
+        params: Parameter signature of the extraction run
+    """
+    records = np.array(sorted(samples), dtype=np.float64).reshape(-1, 4)
+    times, diffs, motion = records[:, 1], records[:, 2], records[:, 3]
+    
+    if len(times):
+        # A shot starts at the first sample and at every sample above the scene-change threshold
+        boundaries = np.flatnonzero(diffs > min_scene_change)
+        starts_at = np.union1d([0], boundaries)
+        starts = times[starts_at]
+        ends = np.append(times[starts_at[1:]], times[-1])
+        peak_motion = np.maximum.reduceat(motion, starts_at)
+        representative_times = times[starts_at + np.array([
+            int(np.argmax(motion[begin:end]))
+            for begin, end in zip(starts_at, np.append(starts_at[1:], len(times)))
+        ], dtype=np.int64)]
+    else:
+        starts = ends = peak_motion = representative_times = np.zeros(0)
+    
+    # A saved key frame represents the shot it falls in
+    representative_frames = np.full(len(starts), "", dtype=object)
+    for path, timestamp, _, _, _ in sorted(key_frames, key=lambda key: key[1], reverse=True):
+        segment = int(np.searchsorted(starts, timestamp, side="right")) - 1
+        if 0 <= segment < len(starts):
+            representative_times[segment] = timestamp
+            representative_frames[segment] = Path(path).name
+    
+    key_frames = sorted(key_frames, key=lambda key: key[1])
+    return ShotIndex(
+        starts=starts.astype(np.float32),
+        ends=ends.astype(np.float32),
+        peak_motion=peak_motion.astype(np.float32),
+        representative_times=representative_times.astype(np.float32),
+        representative_frames=representative_frames.astype(str),
+        key_times=np.array([key[1] for key in key_frames], dtype=np.float64),
+        key_frames=np.array([Path(key[0]).name for key in key_frames], dtype=str),
+        key_scene_scores=np.array([key[2] for key in key_frames], dtype=np.float32),
+        key_motion_scores=np.array([key[3] for key in key_frames], dtype=np.float32),
+        key_scene_changes=np.array([key[4] for key in key_frames], dtype=bool),
+        params=params
+    )
@@ -0,0 +1,202 @@
+"""
+Video probe module
+Reads video stream properties once per file and shares them between pipeline steps
+"""
+
+import json
+import logging
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class VideoProbe:
+    """Stream properties of a video file."""
+    path: str
+    duration: float
+    fps: float
+    frame_count: int
+    width: int   # Display width, after applying rotation
+    height: int  # Display height, after applying rotation
+    codec: str
+    rotation: int
+    keyframe_times: Optional[List[float]] = None
+    
+    @property
+    def size(self) -> Tuple[int, int]:
+        """Display (width, height) of the video."""
+        return self.width, self.height
+    
+    def to_dict(self) -> dict:
+        """Convert to a JSON-serializable dictionary."""
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "VideoProbe":
+        """Create a probe from a dictionary produced by to_dict."""
+        return cls(**data)
+
+# Probe results kept for the most recently probed videos
+PROBE_CACHE_SIZE = 64
+
+# Probe results keyed by file identity (resolved path, size, modification time), least recently used first
+_probe_cache: "OrderedDict[Tuple[str, int, int], VideoProbe]" = OrderedDict()
+_probe_cache_lock = threading.Lock()
+
+def _file_identity(video_path: Path) -> Tuple[str, int, int]:
+    """Identify a file by resolved path, size and modification time."""
+    stat = os.stat(video_path)
+    return str(Path(video_path).resolve()), stat.st_size, stat.st_mtime_ns
+
+def _parse_rate(rate: Optional[str]) -> float:
+    """Parse an ffprobe frame rate such as '30000/1001'."""
+    if not rate or rate in ("0/0", "N/A"):
+        return 0.0
+    if "/" in rate:
+        numerator, denominator = rate.split("/", 1)
+        return float(numerator) / float(denominator) if float(denominator) else 0.0
+    return float(rate)
+
+def list_keyframe_times(video_path: Union[str, Path]) -> List[float]:
+    """
+    List the presentation times of the codec keyframes (I-frames) of a video.
+    
+    Uses ffprobe with -skip_frame nokey, so only keyframes are decoded.
+    """
+    result = subprocess.run(
+        [
+            "ffprobe", "-v", "error", "-select_streams", "v:0",
+            "-skip_frame", "nokey",
+            "-show_entries", "frame=best_effort_timestamp_time",
+            "-of", "csv=p=0",
+            str(video_path)
+        ],
+        capture_output=True, text=True, check=True
+    )
+    times = []
+    for line in result.stdout.splitlines():
+        value = line.strip().rstrip(",")
+        if value and value != "N/A":
+            times.append(float(value))
+    return times
+
+def _probe_ffprobe(video_path: Path) -> VideoProbe:
+    """Read stream properties with a single ffprobe call."""
+    result = subprocess.run(
+        [
+            "ffprobe", "-v", "error", "-select_streams", "v:0",
+            "-show_entries",
+            "stream=codec_name,width,height,avg_frame_rate,r_frame_rate,nb_frames,duration"
+            ":stream_tags=rotate:stream_side_data=rotation:format=duration",
+            "-of", "json",
+            str(video_path)
+        ],
+        capture_output=True, text=True, check=True
+    )
+    info = json.loads(result.stdout)
+    stream = info["streams"][0]
+    
+    fps = _parse_rate(stream.get("avg_frame_rate")) or _parse_rate(stream.get("r_frame_rate"))
+    duration = float(stream.get("duration") or info.get("format", {}).get("duration") or 0.0)
+    frame_count = int(stream["nb_frames"]) if str(stream.get("nb_frames", "")).isdigit() else int(round(duration * fps))
+    if not duration and fps > 0:
+        duration = frame_count / fps
+    
+    rotation = int(float(stream.get("tags", {}).get("rotate", 0)))
+    for side_data in stream.get("side_data_list", []):
+        if "rotation" in side_data:
+            rotation = int(float(side_data["rotation"]))
+    rotation %= 360
+    
+    width, height = int(stream.get("width", 0)), int(stream.get("height", 0))
+    if rotation in (90, 270):
+        width, height = height, width
+    
+    return VideoProbe(
+        path=str(video_path),
+        duration=duration,
+        fps=fps,
+        frame_count=frame_count,
+        width=width,
+        height=height,
+        codec=stream.get("codec_name", "unknown"),
+        rotation=rotation
+    )
+
+def _probe_opencv(video_path: Path) -> VideoProbe:
+    """Read stream properties through OpenCV when ffprobe is unavailable."""
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video: {video_path}")
+    
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+    probe = VideoProbe(
+        path=str(video_path),
+        duration=frame_count / fps if fps > 0 else 0.0,
+        fps=fps,
+        frame_count=frame_count,
+        width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        codec="".join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00 ") or "unknown",
+        rotation=0
+    )
+    cap.release()
+    return probe
+
+def probe_video(video_path: Union[str, Path], with_keyframes: bool = False) -> VideoProbe:
+    """
+    Probe a video once and cache the result by file identity.
+    
+    Args:
+        video_path: Path to video file
+        with_keyframes: Also list keyframe times (decodes keyframes only)
+    
+    Returns:
+        VideoProbe with duration, fps, frame count, display size, codec and rotation
+    """
+    video_path = Path(video_path)
+    identity = _file_identity(video_path)
+    
+    with _probe_cache_lock:
+        probe = _probe_cache.get(identity)
+        if probe is not None:
+            _probe_cache.move_to_end(identity)
+    
+    if probe is None:
+        try:
+            probe = _probe_ffprobe(video_path)
+        except (OSError, subprocess.CalledProcessError, KeyError, IndexError, ValueError) as e:
+            logger.debug(f"ffprobe failed, falling back to OpenCV: {str(e)}")
+            probe = _probe_opencv(video_path)
+        logger.debug(f"Probed video {video_path.name}: {probe.width}x{probe.height} {probe.codec} "
+                     f"{probe.fps:.2f} fps, {probe.duration:.2f}s")
+    
+    if with_keyframes and probe.keyframe_times is None:
+        try:
+            probe.keyframe_times = list_keyframe_times(video_path)
+        except (OSError, subprocess.CalledProcessError) as e:
+            logger.warning(f"Could not list keyframes: {str(e)}")
+    
+    with _probe_cache_lock:
+        _probe_cache[identity] = probe
+        _probe_cache.move_to_end(identity)
+        while len(_probe_cache) > PROBE_CACHE_SIZE:
+            _probe_cache.popitem(last=False)
+    return probe
+
+def forget_probe(video_path: Union[str, Path]):
+    """Drop the cached probes of a video, such as when its file is deleted after a job."""
+    resolved = str(Path(video_path).resolve())
+    with _probe_cache_lock:
+        for identity in [identity for identity in _probe_cache if identity[0] == resolved]:
+            del _probe_cache[identity]
@@ -0,0 +1,142 @@
+"""
+Vision cache module
+Persistent, content-addressed cache of vision API results shared across jobs
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 30 * 24 * 3600         # Seconds a result stays valid
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # Size of stored results before least recently used entries are evicted
+
+def make_cache_key(content: bytes, provider: str, features: str = "", model: str = "",
+                   prompt_version: str = "", prompt: str = "") -> str:
+    """
+    Key of a vision result: hash of the image bytes sent plus everything that shapes the answer.
+    
+    Args:
+        content: Image bytes as sent to the provider
+        provider: Provider name, such as "google" or "openai"
+        features: Requested feature set
+        model: Model name
+        prompt_version: Version of the prompt template
+        prompt: Prompt text, which carries the per-video context
+    """
+    digest = hashlib.sha256()
+    digest.update(hashlib.sha256(content).digest())
+    for part in (provider, features, model, prompt_version, hashlib.sha256(prompt.encode("utf-8")).hexdigest()):
+        digest.update(b"\0" + part.encode("utf-8"))
+    return digest.hexdigest()
+
+class VisionCache:
+    """
+    SQLite cache of vision API results, keyed by make_cache_key.
+    
+    Entries expire after ttl seconds. When the stored results exceed max_bytes,
+    the least recently used entries are evicted. Hits and misses are counted
+    per provider.
+    """
+    
+    def __init__(self, db_path: Union[str, Path], ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize vision cache.
+        
+        Args:
+            db_path: Path of the SQLite database, created if missing
+            ttl: Seconds a result stays valid
+            max_bytes: Total size of stored results to keep
+        """
+        self.db_path = Path(db_path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, "
+                "provider TEXT NOT NULL, "
+                "value TEXT NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, "
+                "accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_accessed_at ON results (accessed_at)")
+    
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per call, so the cache can be used from worker threads
+        return sqlite3.connect(self.db_path, timeout=10)
+    
+    def _count(self, counters: Dict[str, int], provider: str):
+        with self._lock:
+            counters[provider] = counters.get(provider, 0) + 1
+    
+    def get(self, key: str, provider: str) -> Optional[dict]:
+        """Get a cached result, or None on a miss or an expired entry."""
+        now = time.time()
+        try:
+            with closing(self._connect()) as conn, conn:
+                row = conn.execute("SELECT value, created_at FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None and now - row[1] > self.ttl:
+                    conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                    row = None
+                if row is not None:
+                    conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            logger.warning(f"Vision cache read failed: {str(e)}")
+            row = None
+        
+        if row is None:
+            self._count(self.misses, provider)
+            return None
+        self._count(self.hits, provider)
+        return json.loads(row[0])
+    
+    def put(self, key: str, provider: str, value: dict):
+        """Store a result, then evict expired and least recently used entries over max_bytes."""
+        data = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (key, provider, value, size, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, provider, data, len(data.encode("utf-8")), now, now)
+                )
+                self._evict(conn, now)
+        except sqlite3.Error as e:
+            logger.warning(f"Vision cache write failed: {str(e)}")
+    
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Delete expired entries, then the least recently used ones until the cache fits max_bytes."""
+        conn.execute("DELETE FROM results WHERE created_at < ?", (now - self.ttl,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY accessed_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        logger.debug(f"Evicted {evicted} vision cache entries")
+    
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit and miss counts per provider, for logging."""
+        with self._lock:
+            return {
+                provider: {"hits": self.hits.get(provider, 0), "misses": self.misses.get(provider, 0)}
+                for provider in sorted(set(self.hits) | set(self.misses))
+            }
@@ -0,0 +1,165 @@
+"""
+Vision payload module
+Resizes and recompresses frames before they are sent to the vision APIs, and accounts for the savings
+"""
+
+import logging
+import math
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .frame_encoding import FrameOutputProfile
+
+logger = logging.getLogger(__name__)
+
+OPENAI_DETAIL_LEVELS = ("low", "high", "auto")
+
+@dataclass
+class PayloadProfile:
+    """Size, JPEG quality and OpenAI detail level of the images sent to one vision provider."""
+    max_long_edge: Optional[int] = None  # None keeps the frame resolution
+    quality: int = 85
+    detail: Optional[str] = None  # OpenAI detail level ("low", "high" or "auto"), None for other providers
+    
+    @property
+    def output_profile(self) -> FrameOutputProfile:
+        return FrameOutputProfile(max_long_edge=self.max_long_edge, quality=self.quality)
+
+# GPT-4o bills high-detail images per 512px tile after fitting the short side to 768px,
+# so a 768px long edge halves the tiles of a 1024px 16:9 frame. Google Vision label and
+# object detection is specified for 640x480 input.
+PAYLOAD_PROFILES = {
+    "openai": PayloadProfile(max_long_edge=768, quality=80, detail="auto"),
+    "google": PayloadProfile(max_long_edge=640, quality=80)
+}
+
+def get_payload_profile(name: str) -> PayloadProfile:
+    """Get a vision payload profile by name."""
+    if name not in PAYLOAD_PROFILES:
+        raise ValueError(f"Unknown vision payload profile: {name}")
+    return PAYLOAD_PROFILES[name]
+
+def estimate_openai_image_tokens(width: int, height: int, detail: str = "auto") -> int:
+    """
+    Estimate the input tokens GPT-4o bills for an image.
+    
+    Low detail is a flat 85 tokens. High detail fits the image into 2048x2048,
+    scales the short side down to 768px and bills 170 tokens per 512px tile
+    plus 85. Auto is treated as high detail for images over 512px.
+    """
+    if width <= 0 or height <= 0:
+        return 0
+    if detail == "auto":
+        detail = "high" if max(width, height) > 512 else "low"
+    if detail == "low":
+        return 85
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+    return 85 + 170 * math.ceil(width / 512) * math.ceil(height / 512)
+
+@dataclass
+class PreparedPayload:
+    """An image ready to send to a vision API, with its size before preparation."""
+    data: bytes
+    mime_type: str
+    width: int
+    height: int
+    original_bytes: int
+    original_size: Tuple[int, int]
+    detail: Optional[str] = None
+    
+    @property
+    def tokens(self) -> int:
+        """Estimated OpenAI input tokens of the prepared image."""
+        return estimate_openai_image_tokens(self.width, self.height, self.detail or "auto")
+    
+    @property
+    def original_tokens(self) -> int:
+        """Estimated OpenAI input tokens of the original image sent without a detail level."""
+        return estimate_openai_image_tokens(*self.original_size, "auto")
+
+def _mime_type(data: bytes) -> str:
+    return "image/webp" if data[:4] == b"RIFF" and data[8:12] == b"WEBP" else "image/jpeg"
+
+def prepare_payload(data: bytes, profile: PayloadProfile, detail: Optional[str] = None) -> PreparedPayload:
+    """
+    Downscale and recompress an encoded frame for a vision API.
+    
+    The original bytes are kept when the frame is already within the size limit
+    and recompressing would not make it smaller, or when it cannot be decoded.
+    
+    Args:
+        data: Encoded frame (JPEG or WebP)
+        profile: Target size, quality and default detail level
+        detail: OpenAI detail level for this frame, overriding the profile's
+    """
+    detail = detail or profile.detail
+    if detail is not None and detail not in OPENAI_DETAIL_LEVELS:
+        raise ValueError(f"Unknown OpenAI detail level: {detail}")
+    
+    frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        logger.debug("Could not decode frame for payload preparation, sending it unchanged")
+        return PreparedPayload(data, _mime_type(data), 0, 0, len(data), (0, 0), detail)
+    
+    height, width = frame.shape[:2]
+    resize = bool(profile.max_long_edge) and max(width, height) > profile.max_long_edge
+    encoded = profile.output_profile.encode(frame)
+    if encoded is None or (not resize and len(encoded) >= len(data)):
+        return PreparedPayload(data, _mime_type(data), width, height, len(data), (width, height), detail)
+    
+    if resize:
+        scale = profile.max_long_edge / max(width, height)
+        new_width, new_height = max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+    else:
+        new_width, new_height = width, height
+    return PreparedPayload(encoded, "image/jpeg", new_width, new_height, len(data), (width, height), detail)
+
+class PayloadStats:
+    """Bytes and estimated tokens of the payloads sent to one provider, before and after preparation."""
+    
+    def __init__(self):
+        self.images = 0
+        self.original_bytes = 0
+        self.sent_bytes = 0
+        self.original_tokens = 0
+        self.sent_tokens = 0
+        self._lock = threading.Lock()
+    
+    def add(self, payload: PreparedPayload):
+        with self._lock:
+            self.images += 1
+            self.original_bytes += payload.original_bytes
+            self.sent_bytes += len(payload.data)
+            self.original_tokens += payload.original_tokens
+            self.sent_tokens += payload.tokens
+    
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - self.sent_bytes
+    
+    @property
+    def tokens_saved(self) -> int:
+        return self.original_tokens - self.sent_tokens
+    
+    def to_dict(self, with_tokens: bool = True) -> Dict[str, int]:
+        """Counters as a dictionary, for logging."""
+        stats = {
+            "images": self.images,
+            "original_bytes": self.original_bytes,
+            "sent_bytes": self.sent_bytes,
+            "bytes_saved": self.bytes_saved
+        }
+        if with_tokens:
+            stats.update({
+                "original_tokens": self.original_tokens,
+                "sent_tokens": self.sent_tokens,
+                "tokens_saved": self.tokens_saved
+            })
+        return stats